@@ -5,13 +5,13 @@ from typing import Dict, List, Any, Callable
 from datetime import datetime, timedelta
 
 import pytz
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
-from pymongo import UpdateOne
+from pymongo import AsyncMongoClient, UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
 from dotenv import load_dotenv
 
-from Database.database.collection_config import CollectionConfig
 from Database.database.collection_manager import CollectionManager
-from Database.database.connection_pool import ConnectionPool
+from Database.database.connection_pool import ConnectionPool, maybe_await
 from Database.database.database_properties import DatabaseProperties
 from Database.database.define_collections import DefineCollections
 
@@ -40,14 +40,14 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
 
         # Create connection pools for each URI
         self.connection_pools = {}
-        self.connection_pools['primary'] = ConnectionPool(self.primary_uri, connection_name='primary')
+        self.connection_pools['primary'] = ConnectionPool.get_or_create(self.primary_uri, connection_name='primary')
 
         if self.secondary_uri:
-            self.connection_pools['secondary'] = ConnectionPool(self.secondary_uri, connection_name='secondary')
+            self.connection_pools['secondary'] = ConnectionPool.get_or_create(self.secondary_uri, connection_name='secondary')
             logger.info("Secondary connection pool configured")
 
         if self.third_uri:
-            self.connection_pools['third'] = ConnectionPool(self.third_uri, connection_name='third')
+            self.connection_pools['third'] = ConnectionPool.get_or_create(self.third_uri, connection_name='third')
             logger.info("Third connection pool configured")
         else:
             logger.warning("No Third MongoDB URI provided")
@@ -58,21 +58,17 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
         for i, name in enumerate(connection_names, 3):
             uri_key = f"{name}_uri"
             if uri_key in self.additional_uris:
-                self.connection_pools[name] = ConnectionPool(self.additional_uris[uri_key], connection_name=name)
+                self.connection_pools[name] = ConnectionPool.get_or_create(self.additional_uris[uri_key], connection_name=name)
                 logger.info(f"{name.capitalize()} connection pool configured")
             else:
                 # Stop at first missing connection to maintain order
                 break
 
-        self.databases: Dict[str, AsyncIOMotorDatabase] = {}
+        self.databases: Dict[str, AsyncDatabase] = {}
         self.collections: Dict[str, CollectionManager] = {}
-        self._collection_configs: Dict[str, CollectionConfig] = {}
         self._initialized = False
         self._lock = asyncio.Lock()
 
-        # Define collection configurations with indexes
-        self._define_collection_configs()
-
     async def initialize(self):
         """Initialize the database manager with connection pooling and collection setup."""
         if self._initialized:
@@ -143,7 +139,8 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
                         f"Connection '{connection_name}' not available for {config_key}, falling back to primary")
                     connection_name = 'primary'
 
-                client = await self.connection_pools[connection_name].get_client()
+                pool = self.connection_pools[connection_name]
+                client = await pool.get_client()
                 database = client[config.database]
                 collection = database[config.name]
 
@@ -160,7 +157,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
                         # Collection might already exist
                         pass
 
-                manager = CollectionManager(collection, config)
+                manager = CollectionManager(collection, config, pool)
                 self.collections[config_key] = manager
 
                 logger.debug(f"Initialized collection manager for {config_key} on {connection_name} connection")
@@ -170,12 +167,15 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
                 raise
 
     async def _create_all_indexes(self):
-        """Create indexes for all collections."""
-        for config_key, manager in self.collections.items():
-            try:
-                await manager.create_indexes()
-            except Exception as e:
-                logger.warning(f"Error creating indexes for {config_key}: {e}")
+        """Create indexes for all collections concurrently, one create_indexes call per collection."""
+        config_keys = list(self.collections)
+        results = await asyncio.gather(
+            *(self.collections[key].create_indexes(comment='bootstrap') for key in config_keys),
+            return_exceptions=True
+        )
+        for config_key, result in zip(config_keys, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error creating indexes for {config_key}: {result}")
 
     def _ensure_initialized(self):
         """Ensure the database manager is initialized."""
@@ -184,7 +184,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
 
     # Collection Access Methods
 
-    def get_database(self, name: str) -> AsyncIOMotorDatabase:
+    def get_database(self, name: str) -> AsyncDatabase:
         """
         Get a database by name.
 
@@ -223,7 +223,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
             raise ValueError(f"Collection '{collection_key}' not configured")
         return self.collections[collection_key]
 
-    def get_raw_collection(self, database_name: str, collection_name: str) -> AsyncIOMotorCollection:
+    def get_raw_collection(self, database_name: str, collection_name: str) -> AsyncCollection:
         """
         Get raw collection access for advanced operations.
 
@@ -237,7 +237,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
         database = self.get_database(database_name)
         return database[collection_name]
 
-    def get_client(self, connection_name: str = 'primary') -> AsyncIOMotorClient:
+    def get_client(self, connection_name: str = 'primary') -> AsyncMongoClient:
         """
         Get a client for a specific connection.
 
@@ -245,14 +245,14 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
             connection_name: Name of the connection pool ('primary', 'secondary', 'third', etc.)
 
         Returns:
-            AsyncIOMotorClient instance
+            AsyncMongoClient instance
         """
         self._ensure_initialized()
         if connection_name not in self.connection_pools:
             raise ValueError(f"Connection '{connection_name}' not configured")
         return self.connection_pools[connection_name].client
 
-    async def get_client_async(self, connection_name: str = 'primary') -> AsyncIOMotorClient:
+    async def get_client_async(self, connection_name: str = 'primary') -> AsyncMongoClient:
         """
         Get a client for a specific connection asynchronously.
 
@@ -260,7 +260,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
             connection_name: Name of the connection pool ('primary', 'secondary', 'third', etc.)
 
         Returns:
-            AsyncIOMotorClient instance
+            AsyncMongoClient instance
         """
         self._ensure_initialized()
         if connection_name not in self.connection_pools:
@@ -268,7 +268,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
         return await self.connection_pools[connection_name].get_client()
 
     def get_database_from_connection(self, database_name: str,
-                                     connection_name: str = 'primary') -> AsyncIOMotorDatabase:
+                                     connection_name: str = 'primary') -> AsyncDatabase:
         """
         Get a database from a specific connection.
 
@@ -287,7 +287,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
         return client[database_name]
 
     def get_raw_collection_from_connection(self, database_name: str, collection_name: str,
-                                           connection_name: str = 'primary') -> AsyncIOMotorCollection:
+                                           connection_name: str = 'primary') -> AsyncCollection:
         """
         Get raw collection access from a specific connection for advanced operations.
 
@@ -317,7 +317,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
         if connection_name in self.connection_pools:
             raise ValueError(f"Connection '{connection_name}' already exists")
 
-        self.connection_pools[connection_name] = ConnectionPool(uri, connection_name=connection_name)
+        self.connection_pools[connection_name] = ConnectionPool.get_or_create(uri, connection_name=connection_name)
         await self.connection_pools[connection_name].initialize()
         logger.info(f"Added new connection: {connection_name}")
 
@@ -327,8 +327,8 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
             raise ValueError("Cannot remove primary connection")
 
         if connection_name in self.connection_pools:
-            await self.connection_pools[connection_name].close()
-            del self.connection_pools[connection_name]
+            # Pools are shared per URI; close() only shuts the client once no other name uses it
+            await self.connection_pools.pop(connection_name).close()
             logger.info(f"Removed connection: {connection_name}")
 
     # Transaction Support
@@ -337,7 +337,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
         """Start a new database session for transactions on specified connection."""
         self._ensure_initialized()
         client = await self.get_client_async(connection_name)
-        return await client.start_session(**kwargs)
+        return await maybe_await(client.start_session(**kwargs))
 
     async def with_transaction(self, callback: Callable, session_options: Dict = None,
                                connection_name: str = 'primary'):
@@ -355,7 +355,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
         session_options = session_options or {}
 
         async with await self.start_session(connection_name, **session_options) as session:
-            async with session.start_transaction():
+            async with await maybe_await(session.start_transaction()):
                 return await callback(session)
 
     # Utility Methods
@@ -500,6 +500,7 @@ class DatabaseManager(DefineCollections, DatabaseProperties):
             # Clear collections and databases
             self.collections.clear()
             self.databases.clear()
+            self._reset_cached_properties()
 
             # Close all connection pools
             for name, pool in self.connection_pools.items():
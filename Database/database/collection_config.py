@@ -1,8 +1,50 @@
 from dataclasses import dataclass
-from typing import List
+from functools import cached_property
+from typing import Any, Callable, Dict, Sequence, Union
 
 from pymongo import IndexModel
 
+# An index spec is either a key list or a dict of IndexModel keyword arguments including 'keys'
+IndexSpec = Union[Sequence[tuple], Dict[str, Any]]
+
+
+def _check_redundant_indexes(config_key: str, indexes: Sequence[IndexModel]):
+    """
+    Reject plain indexes whose key list is a strict prefix of another index on the same collection.
+
+    Unique and partial indexes are skipped since they carry a constraint or
+    cover a different document set than the longer index.
+
+    Raises:
+        ValueError: If a redundant prefix index is configured
+    """
+    keys = [(tuple(index.document['key'].items()), index.document) for index in indexes]
+    for prefix, document in keys:
+        if document.get('unique') or 'partialFilterExpression' in document:
+            continue
+        for other, other_document in keys:
+            if 'partialFilterExpression' in other_document:
+                continue
+            if len(prefix) < len(other) and other[:len(prefix)] == prefix:
+                raise ValueError(
+                    f"Index {document['name']} on {config_key} is a prefix of {other_document['name']}"
+                )
+
+
+def _check_index_names(config_key: str, indexes: Sequence[IndexModel]):
+    """
+    Reject index lists that reuse an index name within one collection.
+
+    Raises:
+        ValueError: If two indexes share a name
+    """
+    seen = set()
+    for index in indexes:
+        name = index.document['name']
+        if name in seen:
+            raise ValueError(f"Duplicate index name {name} on {config_key}")
+        seen.add(name)
+
 
 @dataclass
 class CollectionConfig:
@@ -10,7 +52,39 @@ class CollectionConfig:
     name: str
     database: str
     connection: str = 'primary'
-    indexes: List[IndexModel] = None
+    indexes_factory: Callable[[], Sequence[IndexModel]] = None
     capped: bool = False
     max_size: int = None
     max_documents: int = None
+
+    @classmethod
+    def from_keys(cls, name: str, database: str, connection: str, *key_specs: IndexSpec) -> "CollectionConfig":
+        """
+        Build a config whose IndexModels are created from key specs on first use.
+
+        Args:
+            name: Collection name
+            database: Database name
+            connection: Connection name
+            *key_specs: Key lists, or dicts of IndexModel keyword arguments including 'keys'
+
+        Returns:
+            CollectionConfig with a lazy index factory
+        """
+        def factory():
+            return tuple(
+                IndexModel(**spec) if isinstance(spec, dict) else IndexModel(spec)
+                for spec in key_specs
+            )
+
+        return cls(name=name, database=database, connection=connection, indexes_factory=factory)
+
+    @cached_property
+    def indexes(self) -> Sequence[IndexModel]:
+        """IndexModels for this collection, built and validated on first access."""
+        if self.indexes_factory is None:
+            return ()
+        indexes = tuple(self.indexes_factory())
+        _check_index_names(f"{self.database}.{self.name}", indexes)
+        _check_redundant_indexes(f"{self.database}.{self.name}", indexes)
+        return indexes
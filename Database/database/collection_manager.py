@@ -1,51 +1,239 @@
+import asyncio
+import heapq
 import time
-from datetime import datetime
-from functools import wraps
-from typing import Dict, Any, List, Optional, Union
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Any, Iterable, List, Optional, Tuple, Union
 
 import backoff
-import pytz
-from motor.motor_asyncio import AsyncIOMotorCollection
-from pymongo import UpdateOne, InsertOne, DeleteOne, ReplaceOne
+from pymongo import UpdateOne, UpdateMany, InsertOne, DeleteOne, DeleteMany, ReplaceOne
+from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.errors import BulkWriteError, ConnectionFailure, OperationFailure
 
 from Database.database.collection_config import CollectionConfig
+from Database.database.connection_pool import ConnectionPool, maybe_await
 from utils.logger import get_logger
 
 logger = get_logger("CollectionManager")
 
+# Sentinel returned by cache lookups when a key is absent or expired
+_MISS = object()
+
+UTC = timezone.utc
+
+# Shared default filter for reads without one; never mutated here or by the driver
+_EMPTY_FILTER: Dict[str, Any] = {}
+
+# Documents fetched per cursor round trip unless the caller asks for a different batch size
+_DEFAULT_BATCH_SIZE = 1000
+
+# Timestamp fields stamped by this manager; writing them alone never makes a cached read stale
+_MANAGED_FIELDS = frozenset(('created_at', 'updated_at'))
+
+# Writes that remove or swap out whole documents and so can change any cached read
+_WHOLE_DOCUMENT_OPS = (DeleteOne, DeleteMany, ReplaceOne)
+
+
+def _stamp_update(op: Union[UpdateOne, UpdateMany], now: datetime):
+    """Add updated_at to an update spec; pipeline updates are left alone."""
+    doc = op._doc
+    if type(doc) is dict:
+        doc.setdefault('$set', {})['updated_at'] = now
+
+
+def _stamp_replace(op: ReplaceOne, now: datetime):
+    """Add updated_at to a replacement document, which cannot contain $set."""
+    doc = op._doc
+    if type(doc) is dict:
+        doc['updated_at'] = now
+
+
+def _stamp_insert(op: InsertOne, now: datetime):
+    """Add created_at/updated_at to an inserted document."""
+    doc = op._doc
+    if type(doc) is dict:
+        doc['created_at'] = now
+        doc['updated_at'] = now
+
+
+# Timestamp handler per bulk operation type; deletes have nothing to stamp
+_STAMP_HANDLERS = {
+    UpdateOne: _stamp_update,
+    UpdateMany: _stamp_update,
+    ReplaceOne: _stamp_replace,
+    InsertOne: _stamp_insert,
+}
+
+
+def _normalize_projection(projection: Union[Dict[str, Any], Iterable[str], None]) -> Optional[Dict[str, Any]]:
+    """Accept a tuple/set/frozenset of field names as an inclusion projection."""
+    if isinstance(projection, (tuple, set, frozenset)):
+        return dict.fromkeys(projection, 1)
+    return projection
+
+
+def _top_level_fields(paths) -> set:
+    """Reduce dotted field paths ('stats.xp') to their top-level field names ('stats')."""
+    return {path.split('.', 1)[0] for path in paths}
+
+
+def _touched_fields(filter_dict: Optional[Dict[str, Any]], document: Any = None) -> Optional[frozenset]:
+    """
+    Collect the top-level fields a write can affect.
+
+    Args:
+        filter_dict: Query filter of the write
+        document: Update spec, replacement or inserted document
+
+    Returns:
+        Frozenset of field names, or None when the write may touch any field
+    """
+    if not filter_dict and document is None:
+        return None
+
+    fields = _top_level_fields(k for k in (filter_dict or _EMPTY_FILTER) if not k.startswith('$'))
+    if document is not None:
+        if not isinstance(document, dict):
+            # Aggregation-pipeline updates can touch arbitrary fields
+            return None
+        for key, value in document.items():
+            if key.startswith('$'):
+                if not isinstance(value, dict):
+                    return None
+                fields |= _top_level_fields(value)
+                if key == '$rename':
+                    fields |= _top_level_fields(value.values())
+            else:
+                fields.add(key)
+
+    fields -= _MANAGED_FIELDS
+    return frozenset(fields) if fields else None
+
+
+_COUNT_KEYS = ('inserted_count', 'modified_count', 'deleted_count', 'upserted_count',
+               'nInserted', 'nModified', 'nRemoved', 'nUpserted')
+
+
+def _result_changed(result: Any) -> bool:
+    """
+    Check whether a write result (or BulkWriteError details dict) changed any documents.
+
+    Args:
+        result: PyMongo write result, merged result dict or BulkWriteError.details
+
+    Returns:
+        True if documents were inserted, modified, deleted or upserted
+    """
+    if isinstance(result, dict):
+        return any(result.get(key) for key in _COUNT_KEYS)
+    if getattr(result, 'inserted_id', None) is not None or getattr(result, 'upserted_id', None) is not None:
+        return True
+    return any(getattr(result, key, 0) for key in _COUNT_KEYS[:4])
+
+
+def _key_pattern(document: Dict[str, Any]) -> tuple:
+    """
+    Key pattern of an index, with text fields written the same way for configured and listed indexes.
+
+    The server lists a text index as {'_fts': 'text', '_ftsx': 1} and keeps its fields in 'weights',
+    so both forms are reduced to one sorted ('field', 'text') group where the text keys sit.
+    """
+    key = document['key']
+    if '_fts' in key:
+        text_fields = document.get('weights', ())
+    else:
+        text_fields = [field for field, kind in key.items() if kind == 'text']
+    text_group = [(field, 'text') for field in sorted(text_fields)]
+    pattern = []
+    for field, kind in key.items():
+        if kind == 'text':
+            # First text key (or '_fts') stands in for the whole group
+            pattern.extend(text_group)
+            text_group = []
+        elif field != '_ftsx':
+            pattern.append((field, kind))
+    return tuple(pattern)
+
+
+def _index_spec(document: Dict[str, Any]) -> Tuple[tuple, str]:
+    """Identify an index by its key pattern and partial filter, ignoring its name."""
+    return _key_pattern(document), repr(document.get('partialFilterExpression'))
+
+
+# Index options that change what an index enforces or holds; a mismatch means it must be rebuilt
+_INDEX_OPTIONS = ('unique', 'sparse', 'expireAfterSeconds', 'collation')
+
+
+def _index_options(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Behaviour-changing options of an index, with unset and false options treated alike."""
+    options = {option: document[option] for option in _INDEX_OPTIONS if document.get(option)}
+    pattern = _key_pattern(document)
+    text_fields = [field for field, kind in pattern if kind == 'text']
+    if text_fields:
+        # Filled in with the server's defaults, which listed text indexes always report
+        weights = dict.fromkeys(text_fields, 1)
+        weights.update(document.get('weights') or {})
+        options['weights'] = weights
+        options['default_language'] = document.get('default_language', 'english')
+        options['language_override'] = document.get('language_override', 'language')
+    return options
+
+
+def _is_superseded(document: Dict[str, Any], configured: List[Dict[str, Any]]) -> bool:
+    """Check whether a plain index is a key prefix of a configured full index and so adds nothing."""
+    if _index_options(document) or document.get('partialFilterExpression'):
+        return False
+    keys = _key_pattern(document)
+    return any(
+        not spec.get('partialFilterExpression') and len(spec['key']) > len(keys)
+        and _key_pattern(spec)[:len(keys)] == keys
+        for spec in configured
+    )
+
+
+def _mark_pool_healthy(details: Dict[str, Any]):
+    """backoff success handler: report the operation's connection pool as healthy."""
+    pool = getattr(details['args'][0], 'pool', None)
+    if pool is not None:
+        pool.mark_healthy()
+
+
 def with_retry(max_retries: int = 3, backoff_factor: float = 1.0):
     """Decorator for database operations with exponential backoff retry."""
 
     def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            @backoff.on_exception(
-                backoff.expo,
-                (ConnectionFailure, OperationFailure),
-                max_tries=max_retries,
-                factor=backoff_factor,
-                jitter=backoff.random_jitter
-            )
-            async def _execute():
-                return await func(*args, **kwargs)
-
-            return await _execute()
-
-        return wrapper
+        # Decorate once at definition time; backoff handles coroutines and preserves metadata
+        return backoff.on_exception(
+            backoff.expo,
+            (ConnectionFailure, OperationFailure),
+            max_tries=max_retries,
+            factor=backoff_factor,
+            jitter=backoff.random_jitter,
+            on_success=_mark_pool_healthy
+        )(func)
 
     return decorator
 
 class CollectionManager:
     """Manages CRUD operations for a specific collection with caching and optimization."""
 
-    def __init__(self, collection: AsyncIOMotorCollection, config: CollectionConfig):
+    # Cache size where TTLs start shrinking, and the default bound where least recently used entries are evicted
+    _CACHE_SOFT_LIMIT = 1024
+    _CACHE_HARD_LIMIT = 10_000
+    # Shortest TTL under pressure, as a fraction of the requested duration
+    _MIN_TTL_FACTOR = 0.1
+
+    def __init__(self, collection: AsyncCollection, config: CollectionConfig, pool: ConnectionPool = None):
         self.collection = collection
         self.config = config
+        self.pool = pool
         self.name = config.name
-        self._cache: Dict[str, Any] = {}
-        self._cache_ttl: Dict[str, float] = {}
+        self._cache: "OrderedDict[str, Tuple[float, Any, frozenset]]" = OrderedDict()
+        self._max_entries = self._CACHE_HARD_LIMIT
+        self._expiry_heap: List[Tuple[float, str]] = []
         self._default_cache_duration = 300  # 5 minutes
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
 
     # CREATE Operations
 
@@ -62,14 +250,15 @@ class CollectionManager:
             The inserted document's ID
         """
         try:
-            document['created_at'] = datetime.now(tz=pytz.UTC)
-            document['updated_at'] = datetime.now(tz=pytz.UTC)
+            now = datetime.now(UTC)
+            document['created_at'] = now
+            document['updated_at'] = now
 
             result = await self.collection.insert_one(document, **kwargs)
-            logger.debug(f"Inserted document with ID {result.inserted_id} into {self.name}")
+            logger.debug("Inserted document with ID %s into %s", result.inserted_id, self.name)
 
             # Invalidate relevant caches
-            self._invalidate_cache()
+            self._maybe_invalidate(result, None, document)
 
             return result.inserted_id
         except Exception as e:
@@ -78,13 +267,22 @@ class CollectionManager:
 
     @with_retry(max_retries=3)
     async def create_many(self, documents: List[Dict[str, Any]],
-                          ordered: bool = False, **kwargs) -> List[Any]:
+                          ordered: bool = False,
+                          chunk_size: int = 1000,
+                          concurrency: int = 4,
+                          **kwargs) -> List[Any]:
         """
         Insert multiple documents with bulk operations.
 
+        Large inputs are split into chunks of chunk_size documents. Unordered
+        chunks are inserted concurrently, at most concurrency at a time;
+        ordered chunks are inserted one after another and stop at the first failure.
+
         Args:
             documents: List of documents to insert
             ordered: Whether to perform ordered inserts
+            chunk_size: Maximum number of documents per insert_many call
+            concurrency: Maximum number of unordered chunks in flight
             **kwargs: Additional options for insert_many
 
         Returns:
@@ -95,26 +293,56 @@ class CollectionManager:
 
         try:
             # Add timestamps to all documents
-            now = datetime.now(tz=pytz.UTC)
+            now = datetime.now(UTC)
             for doc in documents:
                 doc['created_at'] = now
                 doc['updated_at'] = now
 
-            result = await self.collection.insert_many(documents, ordered=ordered, **kwargs)
-            logger.debug(f"Inserted {len(result.inserted_ids)} documents into {self.name}")
+            chunks = [documents[i:i + chunk_size] for i in range(0, len(documents), chunk_size)]
+            inserted_ids = []
+
+            if ordered or len(chunks) == 1:
+                for chunk in chunks:
+                    chunk_ids, completed = await self._insert_chunk(chunk, ordered, kwargs)
+                    inserted_ids.extend(chunk_ids)
+                    if not completed and ordered:
+                        break
+            else:
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def insert_limited(chunk):
+                    async with semaphore:
+                        return await self._insert_chunk(chunk, False, kwargs)
+
+                for chunk_ids, _ in await asyncio.gather(*(insert_limited(chunk) for chunk in chunks)):
+                    inserted_ids.extend(chunk_ids)
+
+            logger.debug("Inserted %d documents into %s in %d chunk(s)", len(inserted_ids), self.name, len(chunks))
 
             # Invalidate relevant caches
-            self._invalidate_cache()
+            if inserted_ids:
+                self._invalidate_by_fields(self._bulk_touched_fields((None, doc) for doc in documents))
 
-            return result.inserted_ids
-        except BulkWriteError as bwe:
-            logger.error(f"Bulk write error in {self.name}: {bwe.details}")
-            # Return successfully inserted IDs even on partial failure
-            return [oid for oid in bwe.details.get('insertedIds', {}).values()]
+            return inserted_ids
         except Exception as e:
             logger.error(f"Error creating documents in {self.name}: {e}")
             raise
 
+    async def _insert_chunk(self, chunk: List[Dict[str, Any]], ordered: bool,
+                            kwargs: Dict[str, Any]) -> Tuple[List[Any], bool]:
+        """Insert one chunk, returning the inserted IDs and whether the whole chunk succeeded."""
+        try:
+            result = await self.collection.insert_many(chunk, ordered=ordered, **kwargs)
+            return result.inserted_ids, True
+        except BulkWriteError as bwe:
+            logger.error(f"Bulk write error in {self.name}: {bwe.details}")
+            # Return successfully inserted IDs even on partial failure
+            failed = {error['index'] for error in bwe.details.get('writeErrors', [])}
+            if ordered:
+                stop = min(failed, default=len(chunk))
+                return [doc['_id'] for doc in chunk[:stop]], False
+            return [doc['_id'] for i, doc in enumerate(chunk) if i not in failed], False
+
     # READ Operations
 
     @with_retry(max_retries=2)
@@ -136,19 +364,25 @@ class CollectionManager:
         Returns:
             The found document or None
         """
+        now = time.monotonic()
+
         # Check cache first
-        if cache_key and self._is_cached(cache_key):
-            logger.debug(f"Cache hit for {cache_key} in {self.name}")
-            return self._get_cached(cache_key)
+        if cache_key:
+            cached = self._lookup(cache_key, now)
+            if cached is not _MISS:
+                logger.debug("Cache hit for %s in %s", cache_key, self.name)
+                return cached
 
         try:
-            filter_dict = filter_dict or {}
+            filter_dict = filter_dict if filter_dict is not None else _EMPTY_FILTER
             result = await self.collection.find_one(filter_dict, projection, **kwargs)
 
             # Cache the result if cache_key is provided
             if cache_key and result:
                 duration = cache_duration or self._default_cache_duration
-                self._set_cache(cache_key, result, duration)
+                # The entry depends on the filtered fields and on every field it holds
+                depends_on = frozenset(_top_level_fields(filter_dict)) | frozenset(result)
+                self._set_cache(cache_key, result, duration, now, depends_on)
 
             return result
         except Exception as e:
@@ -157,7 +391,7 @@ class CollectionManager:
 
     @with_retry(max_retries=2)
     async def find_many(self, filter_dict: Dict[str, Any] = None,
-                        projection: Dict[str, Any] = None,
+                        projection: Union[Dict[str, Any], Iterable[str]] = None,
                         sort: List[tuple] = None,
                         limit: int = None,
                         skip: int = 0,
@@ -167,34 +401,63 @@ class CollectionManager:
 
         Args:
             filter_dict: Query filter
-            projection: Fields to include/exclude
+            projection: Fields to include/exclude, or a tuple/frozenset of field names to include
             sort: Sort specification
             limit: Maximum number of documents
             skip: Number of documents to skip
-            **kwargs: Additional options for find
+            **kwargs: Additional options for find (batch_size tunes documents per round trip)
 
         Returns:
             List of found documents
         """
         try:
-            filter_dict = filter_dict or {}
-            cursor = self.collection.find(filter_dict, projection, **kwargs)
-
-            if sort:
-                cursor = cursor.sort(sort)
-            if skip > 0:
-                cursor = cursor.skip(skip)
-            if limit:
-                cursor = cursor.limit(limit)
-
+            cursor = self._build_cursor(filter_dict, projection, sort, limit, skip, kwargs)
             documents = await cursor.to_list(length=limit)
-            logger.debug(f"Found {len(documents)} documents in {self.name}")
+            logger.debug("Found %d documents in %s", len(documents), self.name)
 
             return documents
         except Exception as e:
             logger.error(f"Error finding documents in {self.name}: {e}")
             raise
 
+    async def iter_many(self, filter_dict: Dict[str, Any] = None,
+                        projection: Union[Dict[str, Any], Iterable[str]] = None,
+                        sort: List[tuple] = None,
+                        limit: int = None,
+                        skip: int = 0,
+                        **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream matching documents as each cursor batch arrives.
+
+        Takes the same arguments as find_many, but never holds the full result
+        set in memory. Not retried, since documents may already have been yielded.
+
+        Yields:
+            Found documents
+        """
+        try:
+            cursor = self._build_cursor(filter_dict, projection, sort, limit, skip, kwargs)
+            async for document in cursor:
+                yield document
+        except Exception as e:
+            logger.error(f"Error streaming documents from {self.name}: {e}")
+            raise
+
+    def _build_cursor(self, filter_dict: Optional[Dict[str, Any]], projection: Any, sort: Optional[List[tuple]],
+                      limit: Optional[int], skip: int, kwargs: Dict[str, Any]):
+        """Create a find cursor with sort, skip, limit and batch size applied."""
+        filter_dict = filter_dict if filter_dict is not None else _EMPTY_FILTER
+        batch_size = kwargs.pop('batch_size', min(limit or _DEFAULT_BATCH_SIZE, _DEFAULT_BATCH_SIZE))
+        cursor = self.collection.find(filter_dict, _normalize_projection(projection), **kwargs)
+
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip > 0:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor.batch_size(batch_size)
+
     @with_retry(max_retries=2)
     async def count_documents(self, filter_dict: Dict[str, Any] = None, **kwargs) -> int:
         """
@@ -208,7 +471,7 @@ class CollectionManager:
             Number of matching documents
         """
         try:
-            filter_dict = filter_dict or {}
+            filter_dict = filter_dict if filter_dict is not None else _EMPTY_FILTER
             count = await self.collection.count_documents(filter_dict, **kwargs)
             return count
         except Exception as e:
@@ -222,15 +485,17 @@ class CollectionManager:
 
         Args:
             pipeline: Aggregation pipeline
-            **kwargs: Additional options for aggregate
+            **kwargs: Additional options for aggregate (batch_size tunes documents per round trip)
 
         Returns:
             List of aggregation results
         """
         try:
-            cursor = self.collection.aggregate(pipeline, **kwargs)
+            batch_size = kwargs.pop('batch_size', _DEFAULT_BATCH_SIZE)
+            cursor = await maybe_await(self.collection.aggregate(pipeline, **kwargs))
+            cursor.batch_size(batch_size)
             results = await cursor.to_list(length=None)
-            logger.debug(f"Aggregation returned {len(results)} results from {self.name}")
+            logger.debug("Aggregation returned %d results from %s", len(results), self.name)
             return results
         except Exception as e:
             logger.error(f"Error in aggregation for {self.name}: {e}")
@@ -259,15 +524,15 @@ class CollectionManager:
             # Add updated_at timestamp
             if '$set' not in update_dict:
                 update_dict['$set'] = {}
-            update_dict['$set']['updated_at'] = datetime.now(tz=pytz.UTC)
+            update_dict['$set']['updated_at'] = datetime.now(UTC)
 
             result = await self.collection.update_one(filter_dict, update_dict,
                                                       upsert=upsert, **kwargs)
 
             success = result.modified_count > 0 or (upsert and result.upserted_id is not None)
             if success:
-                logger.debug(f"Updated document in {self.name}")
-                self._invalidate_cache()
+                logger.debug("Updated document in %s", self.name)
+            self._maybe_invalidate(result, filter_dict, update_dict)
 
             return success
         except Exception as e:
@@ -293,13 +558,13 @@ class CollectionManager:
             # Add updated_at timestamp
             if '$set' not in update_dict:
                 update_dict['$set'] = {}
-            update_dict['$set']['updated_at'] = datetime.now(tz=pytz.UTC)
+            update_dict['$set']['updated_at'] = datetime.now(UTC)
 
             result = await self.collection.update_many(filter_dict, update_dict, **kwargs)
 
             if result.modified_count > 0:
-                logger.debug(f"Updated {result.modified_count} documents in {self.name}")
-                self._invalidate_cache()
+                logger.debug("Updated %d documents in %s", result.modified_count, self.name)
+            self._maybe_invalidate(result, filter_dict, update_dict)
 
             return result.modified_count
         except Exception as e:
@@ -325,16 +590,18 @@ class CollectionManager:
         """
         try:
             # Add timestamps to replacement
-            replacement['updated_at'] = datetime.now(tz=pytz.UTC)
+            now = datetime.now(UTC)
+            replacement['updated_at'] = now
             if 'created_at' not in replacement:
-                replacement['created_at'] = datetime.now(tz=pytz.UTC)
+                replacement['created_at'] = now
 
             result = await self.collection.replace_one(filter_dict, replacement,
                                                        upsert=upsert, **kwargs)
 
             success = result.modified_count > 0 or (upsert and result.upserted_id is not None)
             if success:
-                logger.debug(f"Replaced document in {self.name}")
+                logger.debug("Replaced document in %s", self.name)
+            if _result_changed(result):
                 self._invalidate_cache()
 
             return success
@@ -359,12 +626,11 @@ class CollectionManager:
         try:
             result = await self.collection.delete_one(filter_dict, **kwargs)
 
-            if result.deleted_count > 0:
-                logger.debug(f"Deleted document from {self.name}")
+            deleted = result.deleted_count
+            if deleted:
+                logger.debug("Deleted document from %s", self.name)
                 self._invalidate_cache()
-                return True
-
-            return False
+            return bool(deleted)
         except Exception as e:
             logger.error(f"Error deleting document from {self.name}: {e}")
             raise
@@ -385,7 +651,7 @@ class CollectionManager:
             result = await self.collection.delete_many(filter_dict, **kwargs)
 
             if result.deleted_count > 0:
-                logger.debug(f"Deleted {result.deleted_count} documents from {self.name}")
+                logger.debug("Deleted %d documents from %s", result.deleted_count, self.name)
                 self._invalidate_cache()
 
             return result.deleted_count
@@ -397,13 +663,17 @@ class CollectionManager:
 
     @with_retry(max_retries=3)
     async def bulk_write(self, operations: List[Union[UpdateOne, InsertOne, DeleteOne, ReplaceOne]],
-                         ordered: bool = False, **kwargs) -> Dict[str, Any]:
+                         ordered: bool = False, stamp: bool = True, **kwargs) -> Dict[str, Any]:
         """
         Perform bulk write operations for maximum efficiency.
 
+        Unordered operations are split into insert, update and delete
+        sub-batches which are written concurrently.
+
         Args:
             operations: List of bulk operations
             ordered: Whether to perform operations in order
+            stamp: Whether to add created_at/updated_at timestamps (False if the caller already did)
             **kwargs: Additional options for bulk_write
 
         Returns:
@@ -414,61 +684,187 @@ class CollectionManager:
 
         try:
             # Add timestamps to operations where applicable
-            now = datetime.now(tz=pytz.UTC)
-            for op in operations:
-                if isinstance(op, (UpdateOne, ReplaceOne)):
-                    if hasattr(op, '_update') and isinstance(op._update, dict):
-                        if '$set' not in op._update:
-                            op._update['$set'] = {}
-                        op._update['$set']['updated_at'] = now
-                elif isinstance(op, InsertOne):
-                    if hasattr(op, '_doc') and isinstance(op._doc, dict):
-                        op._doc['created_at'] = now
-                        op._doc['updated_at'] = now
-
-            result = await self.collection.bulk_write(operations, ordered=ordered, **kwargs)
+            if stamp:
+                now = datetime.now(UTC)
+                handlers = _STAMP_HANDLERS
+                for op in operations:
+                    handler = handlers.get(type(op))
+                    if handler is not None:
+                        handler(op, now)
+
+            if ordered:
+                groups = [(operations, range(len(operations)))]
+            else:
+                groups = self._group_operations(operations)
 
-            logger.debug(f"Bulk operation completed on {self.name}: "
-                         f"inserted={result.inserted_count}, "
-                         f"modified={result.modified_count}, "
-                         f"deleted={result.deleted_count}")
+            group_results = await asyncio.gather(
+                *(self._bulk_write_group(ops, indices, ordered, kwargs) for ops, indices in groups)
+            )
+            results = {
+                'inserted_count': 0,
+                'modified_count': 0,
+                'deleted_count': 0,
+                'upserted_count': 0,
+                'upserted_ids': {}
+            }
+            errors = []
+            for group_result in group_results:
+                for key in ('inserted_count', 'modified_count', 'deleted_count', 'upserted_count'):
+                    results[key] += group_result[key]
+                results['upserted_ids'].update(group_result['upserted_ids'])
+                errors.extend(group_result['errors'])
+            if errors:
+                results['errors'] = errors
+
+            logger.debug("Bulk operation completed on %s in %d sub-batch(es): inserted=%d, modified=%d, deleted=%d",
+                         self.name, len(groups), results['inserted_count'],
+                         results['modified_count'], results['deleted_count'])
+
+            # Invalidate cache if any modifications occurred, including partial writes
+            if _result_changed(results):
+                if any(isinstance(op, _WHOLE_DOCUMENT_OPS) for op in operations):
+                    self._invalidate_cache()
+                else:
+                    self._invalidate_by_fields(self._bulk_touched_fields(
+                        (getattr(op, '_filter', None), getattr(op, '_doc', None)) for op in operations
+                    ))
 
-            # Invalidate cache if any modifications occurred
-            if result.inserted_count > 0 or result.modified_count > 0 or result.deleted_count > 0:
-                self._invalidate_cache()
+            return results
+        except Exception as e:
+            logger.error(f"Error in bulk write for {self.name}: {e}")
+            raise
 
+    @staticmethod
+    def _group_operations(operations: List[Any]) -> List[Tuple[List[Any], List[int]]]:
+        """Partition operations into insert, update and delete sub-batches, keeping original indexes."""
+        inserts, updates, deletes = ([], []), ([], []), ([], [])
+        for index, op in enumerate(operations):
+            if isinstance(op, InsertOne):
+                group = inserts
+            elif isinstance(op, (DeleteOne, DeleteMany)):
+                group = deletes
+            else:
+                group = updates
+            group[0].append(op)
+            group[1].append(index)
+        return [group for group in (inserts, updates, deletes) if group[0]]
+
+    async def _bulk_write_group(self, operations: List[Any], indices, ordered: bool,
+                                kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Write one sub-batch, mapping upsert and error indexes back to the caller's operation list."""
+        try:
+            result = await self.collection.bulk_write(operations, ordered=ordered, **kwargs)
             return {
                 'inserted_count': result.inserted_count,
                 'modified_count': result.modified_count,
                 'deleted_count': result.deleted_count,
                 'upserted_count': result.upserted_count,
-                'upserted_ids': result.upserted_ids
+                'upserted_ids': {indices[i]: oid for i, oid in result.upserted_ids.items()},
+                'errors': []
             }
         except BulkWriteError as bwe:
             logger.warning(f"Bulk write error in {self.name}: {bwe.details}")
             # Return partial results
             result = bwe.details
+            errors = [dict(error, index=indices[error['index']]) for error in result.get('writeErrors', [])]
             return {
                 'inserted_count': result.get('nInserted', 0),
                 'modified_count': result.get('nModified', 0),
                 'deleted_count': result.get('nRemoved', 0),
                 'upserted_count': result.get('nUpserted', 0),
-                'errors': result.get('writeErrors', [])
+                'upserted_ids': {indices[u['index']]: u['_id'] for u in result.get('upserted', [])},
+                'errors': errors
             }
-        except Exception as e:
-            logger.error(f"Error in bulk write for {self.name}: {e}")
-            raise
 
     # UTILITY Methods
 
-    async def create_indexes(self) -> List[str]:
-        """Create indexes defined in the collection configuration."""
+    async def create_indexes(self, comment: Optional[str] = None, drop_stale: bool = False) -> List[str]:
+        """
+        Create missing configured indexes and report existing ones that drifted from the configuration.
+
+        Indexes whose keys or options changed, and plain indexes made redundant by a longer configured
+        index, are only logged unless drop_stale is set. They may belong to other services or manual
+        operations. With drop_stale, changed indexes are dropped and rebuilt, and redundant ones are
+        dropped once the new indexes exist. Indexes the configuration does not know about are only reported.
+
+        Args:
+            comment: Optional comment attached to the index commands for server-side tracing
+            drop_stale: Drop and rebuild changed indexes and drop redundant ones instead of only logging them
+
+        Returns:
+            Names of the indexes created
+        """
         if not self.config.indexes:
             return []
 
         try:
-            index_names = await self.collection.create_indexes(self.config.indexes)
-            logger.info(f"Created {len(index_names)} indexes for {self.name}: {index_names}")
+            cursor = await maybe_await(self.collection.list_indexes(comment=comment))
+            existing = {}
+            async for index in cursor:
+                existing[index['name']] = index
+            existing.pop('_id_', None)
+
+            configured = [index.document for index in self.config.indexes]
+            matched = set()
+            outdated = []
+            missing = []
+            for index in self.config.indexes:
+                document = index.document
+                current = existing.get(document['name'])
+                if current is None:
+                    # An index already built under another name (e.g. a driver-generated one) counts as present
+                    spec = _index_spec(document)
+                    current = next((ix for ix in existing.values() if _index_spec(ix) == spec), None)
+                if current is None:
+                    missing.append(index)
+                    continue
+                matched.add(current['name'])
+                if _index_spec(current) != _index_spec(document) or _index_options(current) != _index_options(document):
+                    if not drop_stale:
+                        # Building the configured one would clash with the existing name or key pattern
+                        logger.warning("Index %s on %s differs from its configuration %s; "
+                                       "run create_indexes(drop_stale=True) to rebuild it",
+                                       current['name'], self.name, document['name'])
+                        continue
+                    logger.warning("Index %s on %s differs from its configuration %s; rebuilding it",
+                                   current['name'], self.name, document['name'])
+                    outdated.append(current['name'])
+                    missing.append(index)
+
+            superseded = []
+            for name, index in existing.items():
+                if name in matched:
+                    continue
+                if not _is_superseded(index, configured):
+                    logger.warning("Index %s on %s is not in its configuration", name, self.name)
+                elif drop_stale:
+                    superseded.append(name)
+                else:
+                    logger.warning("Index %s on %s is a prefix of a configured index and could be dropped",
+                                   name, self.name)
+
+            if not missing and not superseded:
+                logger.debug("All %d indexes already exist for %s", len(self.config.indexes), self.name)
+                return []
+
+            # Rebuilt indexes keep their key pattern or name, so the old ones must go first
+            for name in outdated:
+                await self.collection.drop_index(name, comment=comment)
+
+            index_names = []
+            if missing:
+                for index in missing:
+                    # Ignored by MongoDB 4.2+, which always builds without holding exclusive locks
+                    index.document.setdefault('background', True)
+
+                index_names = await self.collection.create_indexes(missing, comment=comment)
+                logger.info(f"Created {len(index_names)} indexes for {self.name}: {index_names}")
+
+            # Only dropped once the longer indexes covering their queries exist
+            for name in superseded:
+                await self.collection.drop_index(name, comment=comment)
+            if superseded:
+                logger.info(f"Dropped superseded indexes from {self.name}: {superseded}")
             return index_names
         except Exception as e:
             logger.error(f"Error creating indexes for {self.name}: {e}")
@@ -506,26 +902,113 @@ class CollectionManager:
 
     # CACHE Management
 
-    def _is_cached(self, key: str) -> bool:
-        """Check if a key is cached and not expired."""
-        if key not in self._cache:
-            return False
+    def _lookup(self, key: str, now: float) -> Any:
+        """Get a cached value, or _MISS if the key is absent or expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            self._misses[key] = self._misses.get(key, 0) + 1
+            return _MISS
 
-        if key in self._cache_ttl and time.time() > self._cache_ttl[key]:
+        expires_at, value, _ = entry
+        if now > expires_at:
             del self._cache[key]
-            del self._cache_ttl[key]
-            return False
-
-        return True
+            self._misses[key] = self._misses.get(key, 0) + 1
+            return _MISS
+
+        self._cache.move_to_end(key)
+        self._hits[key] = self._hits.get(key, 0) + 1
+        return value
+
+    def _set_cache(self, key: str, value: Any, duration: int, now: float = None,
+                   depends_on: frozenset = frozenset()):
+        """Set a cached value with TTL, tagged with the fields it depends on."""
+        if now is None:
+            now = time.monotonic()
+        if key not in self._cache and len(self._cache) >= self._max_entries:
+            self._evict_lru(max(1, len(self._cache) // 10))
+
+        expires_at = now + self._adaptive_duration(key, duration)
+        self._cache[key] = (expires_at, value, depends_on)
+        self._cache.move_to_end(key)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        self._sweep_expired(now)
+        self._prune_access_stats()
+
+    def _adaptive_duration(self, key: str, duration: int) -> float:
+        """
+        Scale a TTL by how often the key is hit and by how full the cache is.
 
-    def _get_cached(self, key: str) -> Any:
-        """Get a cached value."""
-        return self._cache.get(key)
+        Frequently hit keys live up to twice as long; once the cache grows past
+        the soft limit every new TTL shrinks, down to _MIN_TTL_FACTOR of duration
+        at _max_entries. LRU eviction, not the TTL, keeps the size bounded.
+        """
+        hits = self._hits.get(key, 0)
+        misses = self._misses.get(key, 0)
+        effective = duration * (1 + min(hits / (hits + misses + 1), 1.0))
+
+        soft, hard = self._CACHE_SOFT_LIMIT, self._max_entries
+        pressure = min(1.0, max(0.0, (len(self._cache) - soft) / max(1, hard - soft)))
+        return max(effective * (1 - pressure), duration * self._MIN_TTL_FACTOR)
+
+    def _evict_lru(self, count: int):
+        """Evict the count least recently used entries."""
+        for _ in range(min(count, len(self._cache))):
+            self._cache.popitem(last=False)
+
+    def _prune_access_stats(self):
+        """Forget access stats for keys no longer cached once either map outgrows twice the cache limit."""
+        limit = 2 * self._max_entries
+        cache = self._cache
+        if len(self._hits) > limit:
+            self._hits = {k: v for k, v in self._hits.items() if k in cache}
+        if len(self._misses) > limit:
+            self._misses = {k: v for k, v in self._misses.items() if k in cache}
+
+    def _sweep_expired(self, now: float):
+        """Evict expired entries from the heap front and compact stale heap entries."""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # Only evict if the entry was not refreshed with a later expiry
+            if entry is not None and entry[0] == expires_at:
+                del self._cache[key]
+
+        # Overwritten or invalidated keys leave stale heap entries behind
+        if len(heap) > 2 * len(self._cache):
+            cache = self._cache
+            self._expiry_heap = [
+                (expires_at, key) for expires_at, key in heap
+                if key in cache and cache[key][0] == expires_at
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    @staticmethod
+    def _bulk_touched_fields(pairs) -> Optional[frozenset]:
+        """Union the touched fields of several (filter, document) writes; None if any may touch anything."""
+        fields = set()
+        for filter_dict, document in pairs:
+            touched = _touched_fields(filter_dict, document)
+            if touched is None:
+                return None
+            fields |= touched
+        return frozenset(fields)
+
+    def _maybe_invalidate(self, result: Any, filter_dict: Optional[Dict[str, Any]] = None, document: Any = None):
+        """Invalidate entries touched by a single write, only if it actually changed documents."""
+        if _result_changed(result):
+            self._invalidate_by_fields(_touched_fields(filter_dict, document))
+
+    def _invalidate_by_fields(self, fields: Optional[frozenset]):
+        """Drop cached entries whose dependencies intersect the written fields; None drops everything."""
+        if fields is None:
+            self._invalidate_cache()
+            return
 
-    def _set_cache(self, key: str, value: Any, duration: int):
-        """Set a cached value with TTL."""
-        self._cache[key] = value
-        self._cache_ttl[key] = time.time() + duration
+        stale = [key for key, (_, _, depends_on) in self._cache.items()
+                 if not depends_on or not depends_on.isdisjoint(fields)]
+        for key in stale:
+            del self._cache[key]
 
     def _invalidate_cache(self, pattern: str = None):
         """Invalidate cache entries, optionally matching a pattern."""
@@ -533,7 +1016,6 @@ class CollectionManager:
             keys_to_remove = [k for k in self._cache.keys() if pattern in k]
             for key in keys_to_remove:
                 self._cache.pop(key, None)
-                self._cache_ttl.pop(key, None)
         else:
             self._cache.clear()
-            self._cache_ttl.clear()
+            self._expiry_heap.clear()
@@ -1,66 +1,151 @@
+import asyncio
+import inspect
+import json
+import os
 import time
-from typing import Dict, Any, Optional
+from typing import ClassVar, Dict, Any, Optional, Tuple
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pymongo import AsyncMongoClient
 from pymongo.errors import ConnectionFailure
 
 from utils.logger import get_logger
 
+load_dotenv()
 logger = get_logger("ConnectionPool")
 
+# Set MONGO_USE_MOTOR=true to fall back to Motor's thread-pool client while native async is rolled out
+USE_MOTOR = os.getenv("MONGO_USE_MOTOR", "false").lower() in ("1", "true", "yes")
+if USE_MOTOR:
+    from motor.motor_asyncio import AsyncIOMotorClient as AsyncClient
+else:
+    AsyncClient = AsyncMongoClient
+
+
+async def maybe_await(value: Any) -> Any:
+    """Await driver results that are coroutines in PyMongo async but plain values in Motor."""
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+def _config_key(config: Dict[str, Any]) -> str:
+    """Hashable, order-independent form of a client config, including list and dict option values."""
+    return json.dumps(config, sort_keys=True, default=repr)
+
+
 class ConnectionPool:
     """Manages MongoDB connection pooling and health monitoring."""
 
+    DEFAULT_CONFIG: ClassVar[Dict[str, Any]] = {
+        'maxPoolSize': 100,
+        'minPoolSize': 10,
+        'maxIdleTimeMS': 30000,
+        'serverSelectionTimeoutMS': 5000,
+        'connectTimeoutMS': 10000,
+        'socketTimeoutMS': 20000,
+        'retryWrites': True,
+        'retryReads': True
+    }
+
+    # Process-wide pools keyed by (uri, pool config) so one deployment gets one client
+    _INSTANCES: ClassVar[Dict[Tuple[str, str], "ConnectionPool"]] = {}
+
     def __init__(self, uri: str, pool_config: Dict[str, Any] = None, connection_name: str = "default"):
         self.uri = uri
         self.connection_name = connection_name
-        self.config = pool_config or {
-            'maxPoolSize': 100,
-            'minPoolSize': 10,
-            'maxIdleTimeMS': 30000,
-            'serverSelectionTimeoutMS': 5000,
-            'connectTimeoutMS': 10000,
-            'socketTimeoutMS': 20000,
-            'retryWrites': True,
-            'retryReads': True
-        }
-        self.client: Optional[AsyncIOMotorClient] = None
+        self.config = pool_config or dict(self.DEFAULT_CONFIG)
+        self.client: Optional[AsyncMongoClient] = None
         self._health_check_interval = 30  # seconds
         self._last_health_check = 0
+        self._health_task: Optional[asyncio.Task] = None
+        # Shared pools stay open until every get_or_create caller has closed them
+        self._key: Optional[Tuple[str, str]] = None
+        self._refs = 0
 
-    async def initialize(self) -> AsyncIOMotorClient:
+    @classmethod
+    def get_or_create(cls, uri: str, pool_config: Dict[str, Any] = None,
+                      connection_name: str = "default") -> "ConnectionPool":
+        """
+        Get the shared pool for a URI and pool config, creating it on first use.
+
+        Args:
+            uri: MongoDB connection URI
+            pool_config: Client options; defaults to DEFAULT_CONFIG
+            connection_name: Label for logging only; the first caller's label is kept
+
+        Returns:
+            The process-wide ConnectionPool for this URI and config; each call must be paired with a close()
+        """
+        config = pool_config or dict(cls.DEFAULT_CONFIG)
+        key = (uri, _config_key(config))
+        pool = cls._INSTANCES.get(key)
+        if pool is None:
+            pool = cls(uri, config, connection_name)
+            pool._key = key
+            cls._INSTANCES[key] = pool
+        else:
+            logger.debug("Reusing %s connection pool for %s", pool.connection_name, connection_name)
+        pool._refs += 1
+        return pool
+
+    async def initialize(self) -> AsyncMongoClient:
         """Initialize the connection pool."""
         if self.client is None:
             logger.info(f"Initializing MongoDB connection pool for {self.connection_name}...")
-            self.client = AsyncIOMotorClient(self.uri, **self.config)
+            self.client = AsyncClient(self.uri, **self.config)
             await self._health_check()
+            self._health_task = asyncio.create_task(self._health_loop())
             logger.info(f"MongoDB connection pool for {self.connection_name} initialized successfully")
         return self.client
 
+    def mark_healthy(self):
+        """Record a successful operation so the background loop can skip its next ping."""
+        self._last_health_check = time.time()
+
+    async def _health_loop(self):
+        """Ping in the background only when no operation has succeeded recently."""
+        while True:
+            await asyncio.sleep(self._health_check_interval)
+            if time.time() - self._last_health_check < self._health_check_interval:
+                continue
+            try:
+                await self._health_check()
+            except ConnectionFailure:
+                # Already logged; PyMongo's server monitoring handles reconnection
+                pass
+
     async def _health_check(self):
         """Perform health check on the connection."""
         try:
             await self.client.admin.command('ping')
             self._last_health_check = time.time()
-            logger.debug(f"MongoDB health check passed for {self.connection_name}")
+            logger.debug("MongoDB health check passed for %s", self.connection_name)
         except Exception as e:
             logger.error(f"MongoDB health check failed for {self.connection_name}: {e}")
             raise ConnectionFailure(f"Database health check failed for {self.connection_name}")
 
-    async def get_client(self) -> AsyncIOMotorClient:
+    async def get_client(self) -> AsyncMongoClient:
         """Get a healthy client connection."""
         if self.client is None:
             await self.initialize()
 
-        # Perform periodic health checks
-        if time.time() - self._last_health_check > self._health_check_interval:
-            await self._health_check()
-
         return self.client
 
     async def close(self):
-        """Close the connection pool."""
+        """Release this caller's share of the pool, closing it once no other user remains."""
+        if self._refs > 1:
+            self._refs -= 1
+            logger.debug("Released %s connection pool, %d users remain", self.connection_name, self._refs)
+            return
+        self._refs = 0
+        if self._key is not None and self._INSTANCES.get(self._key) is self:
+            del self._INSTANCES[self._key]
+
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
         if self.client:
-            self.client.close()
+            await maybe_await(self.client.close())
             self.client = None
             logger.info(f"MongoDB connection pool for {self.connection_name} closed")
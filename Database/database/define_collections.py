@@ -1,304 +1,262 @@
-from pymongo import IndexModel
+import logging
+from types import MappingProxyType
+from typing import ClassVar, Mapping, Tuple
 
 from Database.database.collection_config import CollectionConfig
 from utils.logger import get_logger
 
 logger = get_logger("DefineCollections")
 
+
+# Shared key/direction pairs so repeated index keys reference the same tuple objects
+GID_ASC = ('guild_id', 1)
+UID_ASC = ('user_id', 1)
+UPD_DESC = ('updated_at', -1)
+CREATED_DESC = ('created_at', -1)
+TS_DESC = ('timestamp', -1)
+
+# Metrics with a dedicated per-guild leaderboard index on ecom_users
+_ECOM_LEADERBOARD_METRICS: Tuple[str, ...] = (
+    'xp',
+    'level',
+    'embers',
+    'message_stats.messages',
+    'message_stats.daily_streak',
+    'voice_stats.voice_seconds',
+)
+
+# Collection key -> configuration; IndexModels are only built when a collection's indexes are first used
+_COLLECTION_SPECS: Tuple[Tuple[str, CollectionConfig], ...] = (
+    # Daily collections
+    ('daily_wyr', CollectionConfig.from_keys(
+        'WYR', 'Daily', 'primary',
+        {'keys': [('date', -1)], 'name': 'date_desc'},
+        {'keys': [GID_ASC, ('date', -1)], 'name': 'guild_date_desc'},
+        {'keys': [CREATED_DESC], 'name': 'created_at_desc'}
+    )),
+
+    ('daily_wyr_leaderboard', CollectionConfig.from_keys(
+        'WYR_Leaderboard', 'Daily', 'primary',
+        # Not unique: existing leaderboards may hold duplicate (user, guild) rows from racing find-then-insert writes
+        {'keys': [UID_ASC, GID_ASC], 'name': 'user_guild'},
+        # Leaderboard entries carry no score field; the leaderboard sorts by total_votes
+        {'keys': [('total_votes', -1)], 'name': 'total_votes_desc'},
+        {'keys': [GID_ASC, UPD_DESC], 'name': 'guild_updated'}
+    )),
+
+    ('daily_wyr_mappings', CollectionConfig.from_keys(
+        'WYR_Mappings', 'Daily', 'primary',
+        {'keys': [GID_ASC], 'name': 'guild_id_lookup'},
+        {'keys': [CREATED_DESC], 'name': 'created_at_desc'},
+    )),
+
+    # Guide collections
+    ('guide_menues', CollectionConfig.from_keys(
+        'Menus', 'Guide', 'primary',
+        {'keys': [UID_ASC, GID_ASC], 'name': 'user_guild'},
+        {'keys': [('score', -1)], 'name': 'score_desc'},
+        {'keys': [UPD_DESC], 'name': 'updated_at_desc'}
+    )),
+
+    # Prime Drops Collections
+    ('prime_drops', CollectionConfig.from_keys(
+        'AmazonPrime', 'PrimeDrops', 'primary',
+        {'keys': [('uid', 1)], 'unique': True, 'name': 'uid_unique'},
+        {'keys': [('short_href', 1)], 'name': 'short_href_lookup'},
+        # Label matches outrank description matches; $text queries should project and sort on
+        # {'$meta': 'textScore'} to use the weights
+        {
+            'keys': [('label', 'text'), ('description', 'text')],
+            'name': 'text_search',
+            'weights': {'label': 10, 'description': 1},
+            'default_language': 'english',
+            'language_override': '_lang'
+        }
+    )),
+
+    # Profile collections
+    ('profilecard_themes', CollectionConfig.from_keys(
+        'CustomThemes', 'ProfileCard', 'primary',
+        {'keys': [UID_ASC, GID_ASC, ('theme_name', 1)], 'unique': True,
+         'name': 'user_guild_theme_unique'},
+    )),
+
+    ('profilecard_preferences', CollectionConfig.from_keys(
+        'ProfilePreferences', 'ProfileCard', 'primary',
+        {'keys': [UID_ASC, GID_ASC], 'unique': True, 'name': 'user_guild_unique'},
+    )),
+
+    # Suggestions collections
+    ('suggestions_suggestions', CollectionConfig.from_keys(
+        'Suggestions', 'Suggestions', 'primary',
+        # Open suggestions only; queries must filter status on a subset of these values
+        {
+            'keys': [GID_ASC, CREATED_DESC],
+            'name': 'guild_open_created_at',
+            'partialFilterExpression': {'status': {'$in': ['Pending', 'Under Review']}}
+        },
+        # Every other status filter (Approved, Implemented, Rejected) is served by this one
+        {'keys': [GID_ASC, ('status', 1), CREATED_DESC], 'name': 'guild_status_created_at'},
+        {'keys': [('author_id', 1)], 'name': 'author_id_lookup'},
+        {'keys': [CREATED_DESC], 'name': 'created_at_desc'},
+        {'keys': [GID_ASC, ('suggestion_id', 1)], 'unique': True, 'name': 'guild_suggestion_unique'}
+    )),
+
+    ('suggestions_votes', CollectionConfig.from_keys(
+        'Votes', 'Suggestions', 'primary',
+        {'keys': [('suggestion_id', 1), UID_ASC], 'unique': True, 'name': 'suggestion_user_unique'},
+        {'keys': [UID_ASC, CREATED_DESC], 'name': 'user_created_at_desc'}
+    )),
+
+    ('suggestions_templates', CollectionConfig.from_keys(
+        'Templates', 'Suggestions', 'primary',
+        # Todo - Add indexes for Templates
+    )),
+
+    ('suggestions_userstats', CollectionConfig.from_keys(
+        'UserStats', 'Suggestions', 'primary',
+        {'keys': [UID_ASC], 'unique': True, 'name': 'user_id_unique'},
+        {'keys': [('last_activity', -1)], 'name': 'last_activity_desc'}
+    )),
+
+    ('suggestions_notification_queue', CollectionConfig.from_keys(
+        'NotificationQueue', 'Suggestions', 'primary',
+        {
+            'keys': [('sent', 1), ('created_at', 1)],
+            'name': 'pending_by_created_at',
+            'partialFilterExpression': {'sent': False}
+        },
+        {
+            'keys': [UID_ASC, ('suggestion_id', 1), ('type', 1)],
+            'name': 'unique_pending_per_user_suggestion_type',
+            'unique': True,
+            'partialFilterExpression': {'sent': False}
+        },
+        {'keys': [UID_ASC, ('suggestion_id', 1)], 'name': 'user_suggestion_lookup'}
+    )),
+
+    # Updates and Drops collections
+    ('updates_monthly', CollectionConfig.from_keys(
+        'StatsMonthly', 'Updates-Drops', 'primary',
+        {'keys': [('_id.coll', 1), ('_id.year', -1), ('_id.month', -1)], 'name': 'by_coll_year_month_desc'},
+        {'keys': [UPD_DESC], 'name': 'updated_at_desc'}
+    )),
+
+    ('updates_totals', CollectionConfig.from_keys(
+        'StatsTotals', 'Updates-Drops', 'primary',
+        {'keys': [UPD_DESC], 'name': 'updated_at_desc'},
+    )),
+
+    # Boost Tracking collections
+    ('serverdata_boosts', CollectionConfig.from_keys(
+        'Boosts', 'Server-Data', 'secondary',
+        {'keys': [UID_ASC], 'name': 'user_id_lookup'},
+        {'keys': [('boost_start', -1)], 'name': 'boost_start_desc'},
+        {'keys': [GID_ASC, UID_ASC], 'unique': True, 'name': 'guild_user_unique'},
+        # Only active boosts are looked up by guild; queries must include is_active: True
+        {
+            'keys': [GID_ASC, ('boost_start', -1)],
+            'name': 'active_boosts',
+            'partialFilterExpression': {'is_active': True}
+        }
+    )),
+
+    ('serverdata_boost_events', CollectionConfig.from_keys(
+        'Boost_Events', 'Server-Data', 'secondary',
+        {'keys': [GID_ASC, TS_DESC], 'name': 'guild_ts_desc'},
+        {'keys': [UID_ASC, TS_DESC], 'name': 'user_ts_desc'},
+        {'keys': [('event_type', 1)], 'name': 'event_type_lookup'}
+    )),
+
+    ('serverdata_channels', CollectionConfig.from_keys(
+        'Channels', 'Server-Data', 'secondary',
+        {'keys': [GID_ASC, ('id', 1)], 'unique': True, 'name': 'guild_channel_unique'},
+        {'keys': [GID_ASC, ('type', 1)], 'name': 'guild_type'},
+        {'keys': [GID_ASC, ('category_id', 1)], 'name': 'guild_category'}
+    )),
+
+    # ServerData collections
+    ('serverdata_guilds', CollectionConfig.from_keys(
+        'Guilds', 'Server-Data', 'secondary',
+        {'keys': [('id', 1)], 'unique': True, 'name': 'id_unique'},
+        {'keys': [('owner_id', 1)], 'name': 'owner_id_lookup'},
+        {'keys': [('member_count', -1)], 'name': 'member_count_desc'},
+        {'keys': [UPD_DESC], 'name': 'updated_at_desc'}
+    )),
+
+    ('serverdata_members', CollectionConfig.from_keys(
+        'Members', 'Server-Data', 'secondary',
+        {'keys': [GID_ASC, ('id', 1)], 'unique': True, 'name': 'guild_member_unique'},
+        {'keys': [GID_ASC, ('bot', 1)], 'name': 'guild_bot'},
+        {'keys': [GID_ASC, ('joined_at', -1)], 'name': 'guild_joined_at_desc'},
+        # Multikey over roles; human members only to cap the per-role fan-out, queries must include bot: False
+        {'keys': [GID_ASC, ('roles', 1)], 'name': 'guild_roles_humans', 'partialFilterExpression': {'bot': False}}
+    )),
+
+    ('serverdata_roles', CollectionConfig.from_keys(
+        'Roles', 'Server-Data', 'secondary'
+    )),
+
+    ('ecom_users', CollectionConfig.from_keys(
+        'Stats', 'Users', 'third',
+        # Primary user identification - unique compound index
+        {'keys': [UID_ASC, GID_ASC], 'unique': True, 'name': 'user_guild_unique'},
+
+        # Per-guild leaderboards, one (guild_id, metric desc) compound each
+        *(
+            {'keys': [GID_ASC, (metric, -1)], 'name': f"guild_{metric.replace('.', '_')}_desc"}
+            for metric in _ECOM_LEADERBOARD_METRICS
+        ),
+        {'keys': [GID_ASC, UPD_DESC], 'name': 'guild_updated'},
+
+        # Progression leaderboard; prestige is matched by equality before ranking achievements
+        {'keys': [GID_ASC, ('prestige_level', -1), ('achievements.unlocked_count', -1)],
+         'name': 'guild_prestige_achievements'},
+
+        # Time-based analytics
+        {'keys': [('created_at', 1)], 'name': 'created_at_asc'},
+        {'keys': [('last_voice_activity', -1)], 'name': 'last_voice_activity_desc'},
+
+        # Daily tracking for cleanup sweeps, limited to users active in that channel type
+        {'keys': [('message_stats.today_key', 1)], 'name': 'msg_today',
+         'partialFilterExpression': {'message_stats.messages': {'$gt': 0}}},
+        {'keys': [('voice_stats.today_key', 1)], 'name': 'voice_today',
+         'partialFilterExpression': {'voice_stats.voice_seconds': {'$gt': 0}}}
+    )),
+
+    # Whitelist collections
+    ('serverdata_whitelist', CollectionConfig.from_keys(
+        'Whitelist', 'Server-Data', 'secondary',
+        # Unique whitelist entry per guild and user
+        {'keys': [GID_ASC, UID_ASC], 'unique': True, 'name': 'guild_user_unique'},
+        # Lookup by guild for listing
+        {'keys': [GID_ASC, ('added_at', -1)], 'name': 'guild_added_at'},
+        # Lookup by user ID for quick checks
+        {'keys': [UID_ASC], 'name': 'user_id_lookup'},
+        # Lookup by username (case-sensitive) for resolution
+        {'keys': [GID_ASC, ('username', 1)], 'name': 'guild_username_lookup'},
+        # Find active whitelisted users; queries must include is_active: True
+        {'keys': [GID_ASC], 'name': 'guild_active_partial', 'partialFilterExpression': {'is_active': True}},
+        # Track by who added them
+        {'keys': [('added_by', 1), ('added_at', -1)], 'name': 'added_by_time'}
+    )),
+)
+
+
 class DefineCollections:
-    def _define_collection_configs(self):
-        """Define collection configurations including indexes for optimal performance."""
-
-        # Daily collections
-        self._collection_configs['daily_wyr'] = CollectionConfig(
-            name='WYR',
-            database='Daily',
-            connection='primary',
-            indexes=[
-                IndexModel([('date', -1)]),
-                IndexModel([('guild_id', 1), ('date', -1)]),
-                IndexModel([('created_at', -1)])
-            ]
-        )
-
-        self._collection_configs['daily_wyr_leaderboard'] = CollectionConfig(
-            name='WYR_Leaderboard',
-            database='Daily',
-            connection='primary',
-            indexes=[
-                IndexModel([('user_id', 1), ('guild_id', 1)]),
-                IndexModel([('score', -1)]),
-                IndexModel([('updated_at', -1)])
-            ]
-        )
-
-        self._collection_configs['daily_wyr_mappings'] = CollectionConfig(
-            name='WYR_Mappings',
-            database='Daily',
-            connection='primary',
-            indexes=[
-                IndexModel([('guild_id', 1)]),
-                IndexModel([('created_at', -1)]),
-            ]
-        )
-
-        # Guide collections
-        self._collection_configs['guide_menues'] = CollectionConfig(
-            name='Menus',
-            database='Guide',
-            connection='primary',
-            indexes=[
-                IndexModel([('user_id', 1), ('guild_id', 1)]),
-                IndexModel([('score', -1)]),
-                IndexModel([('updated_at', -1)])
-            ]
-        )
-
-        # Prime Drops Collections
-        self._collection_configs['prime_drops'] = CollectionConfig(
-            name='AmazonPrime',
-            database='PrimeDrops',
-            connection='primary',
-            indexes=[
-                IndexModel([('uid', 1)], unique=True, name='uid_unique'),
-                IndexModel([('short_href', 1)], name='short_href_lookup'),
-                IndexModel([('label', 'text'), ('description', 'text')], name='text_search')
-            ]
-        )
-
-        # Profile collections
-        self._collection_configs['profilecard_themes'] = CollectionConfig(
-            name='CustomThemes',
-            database='ProfileCard',
-            connection='primary',
-            indexes=[
-                IndexModel([('user_id', 1), ('guild_id', 1)], name='user_guild'),
-                IndexModel([('user_id', 1), ('guild_id', 1), ('theme_name', 1)], unique=True,
-                           name='user_guild_theme_unique')
-            ]
-        )
-
-        self._collection_configs['profilecard_preferences'] = CollectionConfig(
-            name='ProfilePreferences',
-            database='ProfileCard',
-            connection='primary',
-            indexes=[
-                IndexModel([('user_id', 1), ('guild_id', 1)], unique=True, name='user_guild_unique')
-            ]
-        )
-
-        # Suggestions collections
-        self._collection_configs['suggestions_suggestions'] = CollectionConfig(
-            name='Suggestions',
-            database='Suggestions',
-            connection='primary',
-            indexes=[
-                IndexModel([('guild_id', 1), ('status', 1)]),
-                IndexModel([('author_id', 1)]),
-                IndexModel([('created_at', -1)]),
-                IndexModel([('guild_id', 1), ('suggestion_id', 1)], unique=True)
-            ]
-        )
-
-        self._collection_configs['suggestions_votes'] = CollectionConfig(
-            name='Votes',
-            database='Suggestions',
-            connection='primary',
-            indexes=[
-                IndexModel([('suggestion_id', 1), ('user_id', 1)], unique=True),
-                IndexModel([('suggestion_id', 1)]),
-                IndexModel([('user_id', 1), ('created_at', -1)])
-            ]
-        )
-
-        self._collection_configs['suggestions_templates'] = CollectionConfig(
-            name='Templates',
-            database='Suggestions',
-            connection='primary',
-            indexes=[
-                # Todo - Add indexes for Templates
-            ]
-        )
-
-        self._collection_configs['suggestions_userstats'] = CollectionConfig(
-            name='UserStats',
-            database='Suggestions',
-            connection='primary',
-            indexes=[
-                IndexModel([('user_id', 1)], unique=True, name='user_id_unique'),
-                IndexModel([('last_activity', -1)], name='last_activity_desc')
-            ]
-        )
-
-        self._collection_configs['suggestions_notification_queue'] = CollectionConfig(
-            name='NotificationQueue',
-            database='Suggestions',
-            connection='primary',
-            indexes=[
-                IndexModel(
-                    [('sent', 1), ('created_at', 1)],
-                    name='pending_by_created_at',
-                    partialFilterExpression={'sent': False}
-                ),
-                IndexModel(
-                    [('user_id', 1), ('suggestion_id', 1), ('type', 1)],
-                    name='unique_pending_per_user_suggestion_type',
-                    unique=True,
-                    partialFilterExpression={'sent': False}
-                ),
-                IndexModel([('user_id', 1), ('suggestion_id', 1)], name='user_suggestion_lookup')
-            ]
-        )
-
-        # Updates and Drops collections
-        self._collection_configs['updates_monthly'] = CollectionConfig(
-            name='StatsMonthly',
-            database='Updates-Drops',
-            connection='primary',
-            indexes=[
-                IndexModel([('_id.coll', 1), ('_id.year', -1), ('_id.month', -1)], name='by_coll_year_month_desc'),
-                IndexModel([('updated_at', -1)], name='updated_at_desc')
-            ]
-        )
-
-        self._collection_configs['updates_totals'] = CollectionConfig(
-            name='StatsTotals',
-            database='Updates-Drops',
-            connection='primary',
-            indexes=[
-                IndexModel([('updated_at', -1)], name='updated_at_desc')
-            ]
-        )
-        logger.info("Database Manager initialized\n\n\n\n\n\n\n")
-
-        # Boost Tracking collections
-        self._collection_configs['serverdata_boosts'] = CollectionConfig(
-            name='Boosts',
-            database='Server-Data',
-            connection='secondary',
-            indexes=[
-                IndexModel([('user_id', 1)]),
-                IndexModel([('guild_id', 1)]),
-                IndexModel([('is_active', 1)]),
-                IndexModel([('boost_start', -1)]),
-                IndexModel([('guild_id', 1), ('user_id', 1)], unique=True),
-                IndexModel([('guild_id', 1), ('is_active', 1), ('boost_start', -1)])
-            ]
-        )
-
-        self._collection_configs['serverdata_boost_events'] = CollectionConfig(
-            name='Boost_Events',
-            database='Server-Data',
-            connection='secondary',
-            indexes=[
-                IndexModel([('guild_id', 1), ('timestamp', -1)]),
-                IndexModel([('user_id', 1), ('timestamp', -1)]),
-                IndexModel([('event_type', 1)]),
-                IndexModel([('timestamp', -1)])
-            ]
-        )
-
-        self._collection_configs['serverdata_channels'] = CollectionConfig(
-            name='Channels',
-            database='Server-Data',
-            connection='secondary',
-            indexes=[
-                IndexModel([('guild_id', 1), ('id', 1)], unique=True),
-                IndexModel([('guild_id', 1), ('type', 1)]),
-                IndexModel([('guild_id', 1), ('category_id', 1)])
-            ]
-        )
-
-        # ServerData collections
-        self._collection_configs['serverdata_guilds'] = CollectionConfig(
-            name='Guilds',
-            database='Server-Data',
-            connection='secondary',
-            indexes=[
-                IndexModel([('id', 1)], unique=True),
-                IndexModel([('owner_id', 1)]),
-                IndexModel([('member_count', -1)]),
-                IndexModel([('updated_at', -1)])
-            ]
-        )
-
-        self._collection_configs['serverdata_members'] = CollectionConfig(
-            name='Members',
-            database='Server-Data',
-            connection='secondary',
-            indexes=[
-                IndexModel([('guild_id', 1), ('id', 1)], unique=True),
-                IndexModel([('guild_id', 1), ('bot', 1)]),
-                IndexModel([('guild_id', 1), ('joined_at', -1)]),
-                IndexModel([('guild_id', 1), ('roles', 1)])
-            ]
-        )
-
-        self._collection_configs['serverdata_roles'] = CollectionConfig(
-            name='Roles',
-            database='Server-Data',
-            connection='secondary',
-            indexes=[
-            ]
-        )
-
-        self._collection_configs['ecom_users'] = CollectionConfig(
-            name='Stats',
-            database='Users',
-            connection='third',
-            indexes=[
-                # Primary user identification - unique compound index
-                IndexModel([('user_id', 1), ('guild_id', 1)], unique=True),
-
-                # Guild-based queries with sorting
-                IndexModel([('guild_id', 1), ('xp', -1)]),
-                IndexModel([('guild_id', 1), ('level', -1)]),
-                IndexModel([('guild_id', 1), ('embers', -1)]),
-                IndexModel([('guild_id', 1), ('updated_at', -1)]),
-
-                # Message stats leaderboards
-                IndexModel([('guild_id', 1), ('message_stats.messages', -1)]),
-                IndexModel([('guild_id', 1), ('message_stats.daily_streak', -1)]),
-
-                # Voice stats leaderboards
-                IndexModel([('guild_id', 1), ('voice_stats.voice_seconds', -1)]),
-                IndexModel([('guild_id', 1), ('voice_stats.active_seconds', -1)]),
-
-                # Achievement and progression
-                IndexModel([('guild_id', 1), ('achievements.unlocked_count', -1)]),
-                IndexModel([('guild_id', 1), ('prestige_level', -1)]),
-
-                # Time-based analytics
-                IndexModel([('created_at', 1)]),
-                IndexModel([('last_voice_activity', -1)]),
-
-                # Daily tracking for cleanup operations
-                IndexModel([('message_stats.today_key', 1)]),
-                IndexModel([('voice_stats.today_key', 1)]),
-
-                # Social and quality metrics
-                IndexModel([('guild_id', 1), ('social_stats.helpfulness_rating', -1)]),
-                IndexModel([('guild_id', 1), ('quality_stats.average_score', -1)])
-            ]
-        )
-
-        # Whitelist collections
-        self._collection_configs['serverdata_whitelist'] = CollectionConfig(
-            name='Whitelist',
-            database='Server-Data',
-            connection='secondary',
-            indexes=[
-                # Unique whitelist entry per guild and user
-                IndexModel([('guild_id', 1), ('user_id', 1)], unique=True, name='guild_user_unique'),
-                # Lookup by guild for listing
-                IndexModel([('guild_id', 1), ('added_at', -1)], name='guild_added_at'),
-                # Lookup by user ID for quick checks
-                IndexModel([('user_id', 1)], name='user_id_lookup'),
-                # Lookup by username (case-sensitive) for resolution
-                IndexModel([('guild_id', 1), ('username', 1)], name='guild_username_lookup'),
-                # Find active whitelisted users
-                IndexModel([('guild_id', 1), ('is_active', 1)], name='guild_active'),
-                # Track by who added them
-                IndexModel([('added_by', 1), ('added_at', -1)], name='added_by_time')
-            ]
-        )
\ No newline at end of file
+    """Collection registry shared read-only by every DatabaseManager instance."""
+
+    _collection_configs: ClassVar[Mapping[str, CollectionConfig]] = MappingProxyType(dict(_COLLECTION_SPECS))
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        extra = cls.extra_configs()
+        if extra:
+            cls._collection_configs = MappingProxyType({**cls._collection_configs, **extra})
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Registered %d collection configs for %s", len(cls._collection_configs), cls.__name__)
+
+    @classmethod
+    def extra_configs(cls) -> Mapping[str, CollectionConfig]:
+        """Collection configs a subclass adds to, or overrides in, the inherited registry."""
+        return {}
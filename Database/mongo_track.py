@@ -1,13 +1,20 @@
 import asyncio
 import os
 import time
-from collections import defaultdict
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from operator import attrgetter
+from types import MappingProxyType
 from typing import Dict, List, Tuple, Any, Set
 
-from pymongo import UpdateOne
+import bson
+from bson import ObjectId
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from dotenv import load_dotenv
 from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.write_concern import WriteConcern
 
 from utils.bot import s
 from utils.logger import get_logger, PerformanceLogger
@@ -18,47 +25,290 @@ MONGO_URI = os.getenv("MONGO_URI2")
 
 logger = get_logger("mongo_track")
 
+# Tracked metrics can be rebuilt from Discord activity, so flushes skip the journal wait
+_TRACK_WRITE_CONCERN = WriteConcern(w=1, j=False)
+
+# Track documents carry float timestamps; the staging TTL datetimes are never read back
+_TRACK_CODEC_OPTIONS = CodecOptions(tz_aware=False)
+
+# Longest the shutdown flush may take before the client is closed regardless
+_SHUTDOWN_FLUSH_TIMEOUT = 30
+
+# Staged flush documents left behind by an interrupted flush expire after this long
+_STAGE_TTL_SECONDS = 3600
+
+# Fields flush documents are matched on; $merge requires a unique index on exactly these in Users
+_MERGE_ON = ("guild_id", "user_id")
+
 
 def _utc_ts() -> float:
 	return datetime.now(timezone.utc).timestamp()
 
 
+# Flattened defaults for every tracked field of a new user document, besides guild_id/user_id
+_SOI_STATIC: Tuple[Tuple[str, Any], ...] = (
+	("xp", 0),
+	("embers", 0),
+	("level", 0),
+	("message_stats.daily_streak", 0),
+	("message_stats.streak_timestamp", 0.0),
+	("message_stats.messages", 0),
+	("message_stats.longest_message", 0),
+	("message_stats.reacted_messages", 0),
+	("message_stats.got_reactions", 0),
+	("message_stats.last_message_time", 0.0),
+	("voice_stats.voice_seconds", 0.0),
+	("voice_stats.active_seconds", 0.0),
+	("voice_stats.muted_time", 0.0),
+	("voice_stats.deafened_time", 0.0),
+	("voice_stats.self_muted_time", 0.0),
+	("voice_stats.self_deafened_time", 0.0),
+	("voice_stats.total_active_percentage", 0.0),
+	("voice_stats.total_unmuted_percentage", 0.0),
+	("voice_stats.voice_sessions", 0),
+	("last_rewarded.message", 0.0),
+	("last_rewarded.voice", 0.0),
+	("last_rewarded.got_reaction", 0.0),
+	("last_rewarded.give_reaction", 0.0),
+	("favorites", {}),
+)
+
+def _expand_paths(flat: Tuple[Tuple[str, Any], ...]) -> dict:
+	"""Build a nested document from (dotted path, value) pairs."""
+	out: dict = {}
+	for path, value in flat:
+		node = out
+		*parents, leaf = path.split(".")
+		for part in parents:
+			node = node.setdefault(part, {})
+		node[leaf] = value
+	return out
+
+
+def _freeze(doc: dict) -> MappingProxyType:
+	"""Read-only view of a nested document, with every sub-document frozen as well."""
+	return MappingProxyType({k: _freeze(v) if isinstance(v, dict) else v for k, v in doc.items()})
+
+
+def _thaw(doc: MappingProxyType) -> dict:
+	"""Fresh mutable copy of a frozen document; leaf values are immutable and shared."""
+	return {k: _thaw(v) if isinstance(v, MappingProxyType) else v for k, v in doc.items()}
+
+
+# Frozen nested default user document, thawed for users with no stored document
+_DEFAULT_TEMPLATE = _freeze(_expand_paths(_SOI_STATIC))
+
+
+def _apply_patch(target: dict, patch: dict):
+	"""Merge patch into target in place, descending into sub-documents present in both."""
+	stack = [(target, patch)]
+	while stack:
+		dst, src = stack.pop()
+		for k, v in src.items():
+			current = dst.get(k)
+			if isinstance(current, dict) and isinstance(v, dict):
+				stack.append((current, v))
+			else:
+				dst[k] = v
+
+
+# Pipeline stage completing staged delta documents with the defaults above
+_FILL_DEFAULTS: dict = {"$set": {path: {"$ifNull": [f"${path}", default]} for path, default in _SOI_STATIC}}
+
+# One shared key string per emoji; reactions repeat a small set of emoji across every user
+_EMOJI_KEYS: Dict[str, str] = {}
+
+
+def _encode_batch(docs: List[dict]) -> List[RawBSONDocument]:
+	"""Encode staged documents to BSON ahead of insert_many, off the event loop."""
+	return [RawBSONDocument(bson.encode(doc)) for doc in docs]
+
+
+def _emoji_key(emoji: Any) -> str:
+	key = str(emoji)
+	shared = _EMOJI_KEYS.get(key)
+	if shared is None:
+		shared = _EMOJI_KEYS[key] = key
+	return shared
+
+
+# VoiceStats time fields that share a name with the stored voice_stats sub-document
+_VOICE_TIME_FIELDS = ("active_seconds", "muted_time", "deafened_time", "self_muted_time", "self_deafened_time")
+# Reads all of them from a VoiceStats entry in one call, in _VOICE_TIME_FIELDS order
+_voice_times = attrgetter(*_VOICE_TIME_FIELDS)
+
+
+@dataclass(slots=True)
+class VoiceStats:
+	"""Voice metrics accumulated for one guild member since the last flush."""
+	active_seconds: float = 0.0
+	muted_time: float = 0.0
+	deafened_time: float = 0.0
+	self_muted_time: float = 0.0
+	self_deafened_time: float = 0.0
+	sessions: int = 0
+	# Percentage sums; averaged over sessions only when read or flushed
+	active_percentage_sum: float = 0.0
+	unmuted_percentage_sum: float = 0.0
+
+	def averages(self) -> Dict[str, float]:
+		"""Mean active/unmuted percentages over the accumulated sessions."""
+		return {
+			"total_active_percentage": self.active_percentage_sum / self.sessions,
+			"total_unmuted_percentage": self.unmuted_percentage_sum / self.sessions,
+		}
+
+	def merge(self, other: "VoiceStats"):
+		"""Add another entry's metrics into this one."""
+		self.active_seconds += other.active_seconds
+		self.muted_time += other.muted_time
+		self.deafened_time += other.deafened_time
+		self.self_muted_time += other.self_muted_time
+		self.self_deafened_time += other.self_deafened_time
+		self.sessions += other.sessions
+		self.active_percentage_sum += other.active_percentage_sum
+		self.unmuted_percentage_sum += other.unmuted_percentage_sum
+
+
+# Staged paths added to the stored counters
+_INC_PATHS = (
+	"message_stats.messages",
+	"message_stats.reacted_messages",
+	"message_stats.got_reactions",
+	"voice_stats.voice_seconds",
+	"voice_stats.active_seconds",
+	"voice_stats.muted_time",
+	"voice_stats.deafened_time",
+	"voice_stats.self_muted_time",
+	"voice_stats.self_deafened_time",
+	"voice_stats.voice_sessions",
+)
+# Staged paths that only ever move forward
+_MAX_PATHS = ("message_stats.longest_message", "message_stats.last_message_time")
+# Staged paths that replace the stored value when the window had the matching activity
+_VOICE_AVG_PATHS = ("voice_stats.total_active_percentage", "voice_stats.total_unmuted_percentage")
+
+
+def _replace_if(condition: dict, path: str) -> dict:
+	return {"$cond": [condition, f"$$new.{path}", f"${path}"]}
+
+
+# A staged streak timestamp is only set for users active this window
+_STREAK_ACTIVE = {"$gt": ["$$new.message_stats.streak_timestamp", 0]}
+_PREV_STREAK = {"$max": [{"$ifNull": ["$message_stats.daily_streak", 0]}, 0]}
+_PREV_STREAK_TS = {"$ifNull": ["$message_stats.streak_timestamp", 0]}
+# UTC day buckets between the stored streak timestamp and this flush; a missing timestamp
+# counts from the epoch and so always starts a new streak
+_DAY_SECONDS = 86400
+_STREAK_DAYS = {"$subtract": [
+	{"$floor": {"$divide": ["$$new.message_stats.streak_timestamp", _DAY_SECONDS]}},
+	{"$floor": {"$divide": [_PREV_STREAK_TS, _DAY_SECONDS]}},
+]}
+
+
+# $merge pipeline combining a staged document ($$new) with the stored one, equivalent to the
+# per-user $inc/$max/$set update it replaces
+_MERGE_WHEN_MATCHED: List[dict] = [{
+	"$set": {
+		**{path: {"$add": [{"$ifNull": [f"${path}", 0]}, f"$$new.{path}"]} for path in _INC_PATHS},
+		**{path: {"$max": [f"${path}", f"$$new.{path}"]} for path in _MAX_PATHS},
+		**{path: _replace_if({"$gt": ["$$new.voice_stats.voice_sessions", 0]}, path) for path in _VOICE_AVG_PATHS},
+		# Next day extends the streak, a gap restarts it, the same day leaves it unchanged
+		"message_stats.daily_streak": {"$cond": [
+			_STREAK_ACTIVE,
+			{"$switch": {
+				"branches": [
+					{"case": {"$eq": [_STREAK_DAYS, 1]}, "then": {"$add": [_PREV_STREAK, 1]}},
+					{"case": {"$gt": [_STREAK_DAYS, 1]}, "then": 1},
+				],
+				"default": _PREV_STREAK,
+			}},
+			"$message_stats.daily_streak",
+		]},
+		"message_stats.streak_timestamp": {"$cond": [
+			_STREAK_ACTIVE,
+			{"$cond": [{"$gt": [_STREAK_DAYS, 0]}, "$$new.message_stats.streak_timestamp", _PREV_STREAK_TS]},
+			"$message_stats.streak_timestamp",
+		]},
+		# Add staged emoji counts to the stored ones key by key
+		"favorites": {"$mergeObjects": [
+			"$favorites",
+			{"$arrayToObject": {"$map": {
+				"input": {"$objectToArray": "$$new.favorites"},
+				"as": "fav",
+				"in": {
+					"k": "$$fav.k",
+					"v": {"$add": ["$$fav.v", {"$ifNull": [{"$let": {
+						"vars": {"prev": {"$first": {"$filter": {
+							"input": {"$objectToArray": {"$ifNull": ["$favorites", {}]}},
+							"cond": {"$eq": ["$$this.k", "$$fav.k"]},
+						}}}},
+						"in": "$$prev.v",
+					}}, 0]}]},
+				},
+			}}},
+		]},
+	}
+}]
+
+
 class TrackManager:
 	"""
     Cache-first tracker for guild activity.
     - Collects message, reaction, and voice aggregates in memory
-    - Periodically flushes aggregated deltas to MongoDB using bulk writes
-    - Minimizes DB round-trips via batching and update operators ($inc, $set, $max, $setOnInsert)
+    - Flushes aggregated deltas to MongoDB with batched $documents/$merge aggregates as soon as a
+      batch worth of users is pending, or every flush_interval seconds at the latest
+    - Minimizes DB round-trips by combining each batch with stored documents server-side (MongoDB 5.1+)
+    - Advances daily streaks server-side, so flushes never read user documents first
     """
 
 	def __init__(self, flush_interval: int = 60, bulk_batch_size: int = 1000):
 		logger.info(f"{s}Initializing TrackManager with flush_interval={flush_interval}s, batch_size={bulk_batch_size}")
 
-		# Caches (nested dicts default)
-		self.message_cache = defaultdict(lambda: defaultdict(int))  # {guild_id: {user_id: msg_count}}
-		self.voice_cache = defaultdict(lambda: defaultdict(float))  # {guild_id: {user_id: voice_seconds}}
-		self.message_length_cache = defaultdict(lambda: defaultdict(int))  # {guild_id: {user_id: longest_msg}}
-		self.last_message_time = defaultdict(lambda: defaultdict(float))  # {guild_id: {user_id: timestamp}}
-		self.daily_streak_cache = defaultdict(lambda: defaultdict(int))  # {guild_id: {user_id: streak}}
-		self.reacted_messages_cache = defaultdict(lambda: defaultdict(int))  # {guild_id: {user_id: reacted_count}}
-		self.got_reactions_cache = defaultdict(lambda: defaultdict(int))  # {guild_id: {user_id: count}}
-		self.emoji_favorites_cache = defaultdict(
-			lambda: defaultdict(lambda: defaultdict(int))
-		)  # {guild_id: {user_id: {emoji: count}}}
-		self.voice_stats_cache: Dict[str, Dict[str, float | int]] = {}  # {f"{guild}:{user}": metrics}
+		# Caches keyed by (guild_id, user_id). Writers store values already converted to the
+		# annotated int/float type, so flushes and overlays read them without coercion
+		self.message_cache: Counter = Counter()  # {(guild_id, user_id): msg_count}
+		self.voice_cache: Counter = Counter()  # {(guild_id, user_id): voice_seconds (float)}
+		self.message_length_cache: Dict[Tuple[str, str], int] = {}  # {(guild_id, user_id): longest_msg}
+		self.last_message_time: Dict[Tuple[str, str], float] = {}  # {(guild_id, user_id): timestamp}
+		self.reacted_messages_cache: Counter = Counter()  # {(guild_id, user_id): reacted_count}
+		self.got_reactions_cache: Counter = Counter()  # {(guild_id, user_id): count}
+		self.emoji_favorites_cache: Dict[Tuple[str, str], Counter] = {}  # {(guild_id, user_id): {emoji: count}}
+		self.voice_stats_cache: Dict[Tuple[str, str], VoiceStats] = {}  # {(guild_id, user_id): metrics}
+
+		# Guilds and users with cached activity, maintained by the increment methods
+		self._active_guilds: Set[str] = set()
+		self._active_users: Dict[str, Set[str]] = defaultdict(set)  # {guild_id: {user_id}}
 
 		# Timing and control
 		self.last_flush = time.time()
 		self.flush_interval = int(flush_interval)
 		self.bulk_batch_size = int(bulk_batch_size)
+		self.max_inflight_commits = 4
+		# Flushes touching more users than this go through the TrackStage collection
+		self.stage_threshold = 10_000
+		self._stage_index_ready = False
+		self._users_index_ready = False
 		self._flush_task: asyncio.Task | None = None
 		self._flush_lock = asyncio.Lock()
+		# Set once a batch worth of users is pending so the flush loop runs ahead of its fallback interval
+		self._flush_trigger = asyncio.Event()
+		self._pending_users = 0
 
 		# Mongo
 		try:
 			self.mongo_client = AsyncIOMotorClient(MONGO_URI)
-			db = self.mongo_client["Ecom-Server"]
-			self.collection = db["Users"]
+			self.db = self.mongo_client.get_database(
+				"Ecom-Server", codec_options=_TRACK_CODEC_OPTIONS, write_concern=_TRACK_WRITE_CONCERN
+			)
+			self.collection = self.db.get_collection(
+				"Users", codec_options=_TRACK_CODEC_OPTIONS, write_concern=_TRACK_WRITE_CONCERN
+			)
+			self.stage = self.db.get_collection(
+				"TrackStage", codec_options=_TRACK_CODEC_OPTIONS, write_concern=_TRACK_WRITE_CONCERN
+			)
+			if not bson.has_c():
+				logger.warning(f"{s}PyMongo BSON C extension unavailable; flushes will use the pure-Python encoder")
 			logger.info(f"{s}MongoDB connection established successfully")
 		except Exception as e:
 			logger.error(f"{s}Failed to establish MongoDB connection: {e}")
@@ -67,117 +317,92 @@ class TrackManager:
 		logger.info(
 			f"{s}TrackManager initialized successfully (flush_interval={self.flush_interval}s, batch={self.bulk_batch_size})")
 
+	def _mark_active(self, guild_id: str, user_id: str):
+		"""Record that a guild member has cached activity to flush."""
+		users = self._active_users[guild_id]
+		if user_id in users:
+			return
+		users.add(user_id)
+		self._active_guilds.add(guild_id)
+		self._pending_users += 1
+		if self._pending_users >= self.bulk_batch_size:
+			self._flush_trigger.set()
+
 	# =========================
 	# Public API - Counters
 	# =========================
+	# Hot paths: called for every message, voice session and reaction, so they do no
+	# error wrapping or debug formatting unless DEBUG is enabled
 	def increment_message_count(self, guild_id: str, user_id: str, message_length: int, timestamp: float):
 		"""Increment message count and track longest message for a user."""
-		try:
-			logger.debug(f"{s}increment_message_count: guild={guild_id}, user={user_id}, length={message_length}")
-
-			self.message_cache[guild_id][user_id] += 1
+		self._mark_active(guild_id, user_id)
+		key = (guild_id, user_id)
+		self.message_cache[key] += 1
+		message_length = int(message_length)
 
-			# Longest message
-			if message_length > self.message_length_cache[guild_id][user_id]:
-				old_length = self.message_length_cache[guild_id][user_id]
-				self.message_length_cache[guild_id][user_id] = message_length
-				if old_length > 0:  # Only log if it's actually an improvement
-					logger.debug(
-						f"{s}New longest message for user {user_id}: {message_length} chars (was {old_length})")
+		# Longest message
+		old_length = self.message_length_cache.get(key, 0)
+		if message_length > old_length:
+			self.message_length_cache[key] = message_length
+			if old_length > 0 and logger.isEnabledFor(10):  # DEBUG level
+				logger.debug(f"{s}New longest message for user {user_id}: {message_length} chars (was {old_length})")
 
-			self.last_message_time[guild_id][user_id] = float(timestamp)
-
-		except Exception as e:
-			logger.error(f"{s}Error in increment_message_count: guild={guild_id}, user={user_id}, error={e}")
+		self.last_message_time[key] = float(timestamp)
 
 	def increment_voice_time(self, guild_id: str, user_id: str, stats: dict):
 		"""
-        Update voice statistics with detailed metrics using incremental updates.
-        stats keys:
-          - voice_seconds
-          - active_seconds
-          - muted_time
-          - deafened_time
-          - self_muted_time
-          - self_deafened_time
-          - active_percentage
-          - unmuted_percentage
-        """
-		try:
-			voice_seconds = float(stats.get("voice_seconds", 0) or 0)
-			active_seconds = float(stats.get("active_seconds", 0) or 0)
-
-			logger.debug(f"{s}increment_voice_time: guild={guild_id}, user={user_id}, "
-						 f"voice_seconds={voice_seconds}, active_seconds={active_seconds}")
-
-			# Update basic voice time
-			self.voice_cache[guild_id][user_id] += voice_seconds
-
-			# Create key for detailed stats
-			key = f"{guild_id}:{user_id}"
-			if key not in self.voice_stats_cache:
-				logger.debug(f"{s}Creating new voice stats entry for {key}")
-				self.voice_stats_cache[key] = {
-					"active_seconds": 0.0,
-					"muted_time": 0.0,
-					"deafened_time": 0.0,
-					"self_muted_time": 0.0,
-					"self_deafened_time": 0.0,
-					"sessions": 0,
-					"total_active_percentage": 0.0,
-					"total_unmuted_percentage": 0.0,
-				}
+		Update voice statistics with detailed metrics using incremental updates.
+		stats keys:
+		  - voice_seconds
+		  - active_seconds
+		  - muted_time
+		  - deafened_time
+		  - self_muted_time
+		  - self_deafened_time
+		  - active_percentage
+		  - unmuted_percentage
+		"""
+		self._mark_active(guild_id, user_id)
 
-			cs = self.voice_stats_cache[key]
-			cs["active_seconds"] += active_seconds
-			cs["muted_time"] += float(stats.get("muted_time", 0) or 0)
-			cs["deafened_time"] += float(stats.get("deafened_time", 0) or 0)
-			cs["self_muted_time"] += float(stats.get("self_muted_time", 0) or 0)
-			cs["self_deafened_time"] += float(stats.get("self_deafened_time", 0) or 0)
-			cs["sessions"] += 1
-
-			# Running averages
-			sessions = int(cs["sessions"])
-			if sessions > 0:
-				ap = float(stats.get("active_percentage", 0) or 0)
-				up = float(stats.get("unmuted_percentage", 0) or 0)
-				cs["total_active_percentage"] = ((cs["total_active_percentage"] * (sessions - 1)) + ap) / sessions
-				cs["total_unmuted_percentage"] = ((cs["total_unmuted_percentage"] * (sessions - 1)) + up) / sessions
-
-			logger.debug(f"{s}Voice stats updated for {key}: sessions={sessions}, "
-						 f"active_pct={cs['total_active_percentage']:.2f}%")
+		# Update basic voice time
+		self.voice_cache[(guild_id, user_id)] += float(stats.get("voice_seconds") or 0)
 
-		except Exception as e:
-			logger.error(f"{s}Error in increment_voice_time: guild={guild_id}, user={user_id}, error={e}")
+		# Detailed stats
+		cs = self.voice_stats_cache.get((guild_id, user_id))
+		if cs is None:
+			cs = self.voice_stats_cache[(guild_id, user_id)] = VoiceStats()
 
-	def increment_reaction_count(self, guild_id: str, reactor_id: str, message_owner_id: str, emoji: str):
-		"""Increment per-user reaction stats and emoji favorites"""
-		try:
-			logger.debug(f"{s}increment_reaction_count: guild={guild_id}, reactor={reactor_id}, emoji={emoji}")
+		cs.active_seconds += float(stats.get("active_seconds") or 0)
+		cs.muted_time += float(stats.get("muted_time") or 0)
+		cs.deafened_time += float(stats.get("deafened_time") or 0)
+		cs.self_muted_time += float(stats.get("self_muted_time") or 0)
+		cs.self_deafened_time += float(stats.get("self_deafened_time") or 0)
+		cs.sessions += 1
+		cs.active_percentage_sum += float(stats.get("active_percentage") or 0)
+		cs.unmuted_percentage_sum += float(stats.get("unmuted_percentage") or 0)
 
-			self.reacted_messages_cache[guild_id][reactor_id] += 1
-			self.emoji_favorites_cache[guild_id][reactor_id][str(emoji)] += 1
+		if logger.isEnabledFor(10):  # DEBUG level
+			logger.debug(f"{s}Voice stats updated for {guild_id}:{user_id}: sessions={cs.sessions}")
 
-		except Exception as e:
-			logger.error(f"{s}Error updating reaction count: guild={guild_id}, reactor={reactor_id}, error={e}")
-
-	async def increment_reacted_messages(self, guild_id: str, user_id: str):
-		try:
-			logger.debug(f"{s}increment_reacted_messages: guild={guild_id}, user={user_id}")
-			self.reacted_messages_cache[guild_id][user_id] += 1
-		except Exception as e:
-			logger.error(f"{s}Error in increment_reacted_messages: guild={guild_id}, user={user_id}, error={e}")
-
-	async def increment_got_reactions(self, guild_id: str, user_id: str):
-		try:
-			logger.debug(f"{s}increment_got_reactions: guild={guild_id}, user={user_id}")
-			self.got_reactions_cache[guild_id][user_id] += 1
-		except Exception as e:
-			logger.error(f"{s}Error in increment_got_reactions: guild={guild_id}, user={user_id}, error={e}")
+	def increment_reaction_count(self, guild_id: str, reactor_id: str, message_owner_id: str, emoji: str):
+		"""Increment the reactor's reaction stats and emoji favorites, and the message owner's received reactions"""
+		self._mark_active(guild_id, reactor_id)
+		self.reacted_messages_cache[(guild_id, reactor_id)] += 1
+		user_favs = self.emoji_favorites_cache.get((guild_id, reactor_id))
+		if user_favs is None:
+			user_favs = self.emoji_favorites_cache[(guild_id, reactor_id)] = Counter()
+		user_favs[_emoji_key(emoji)] += 1
+		if message_owner_id:
+			self._mark_active(guild_id, message_owner_id)
+			self.got_reactions_cache[(guild_id, message_owner_id)] += 1
 
 	async def get_daily_streak(self, guild_id: str, user_id: str) -> int:
+		"""Streak as of the last flush; it is advanced server-side when the flush is merged."""
 		try:
-			streak = int(self.daily_streak_cache[guild_id][user_id])
+			doc = await self.collection.find_one(
+				{"guild_id": guild_id, "user_id": user_id}, {"_id": 0, "message_stats.daily_streak": 1}
+			)
+			streak = int(((doc or {}).get("message_stats") or {}).get("daily_streak") or 0)
 			logger.debug(f"{s}get_daily_streak: guild={guild_id}, user={user_id}, streak={streak}")
 			return streak
 		except Exception as e:
@@ -186,7 +411,7 @@ class TrackManager:
 
 	async def get_longest_message(self, guild_id: str, user_id: str) -> int:
 		try:
-			length = int(self.message_length_cache[guild_id][user_id])
+			length = int(self.message_length_cache.get((guild_id, user_id), 0))
 			logger.debug(f"{s}get_longest_message: guild={guild_id}, user={user_id}, length={length}")
 			return length
 		except Exception as e:
@@ -214,16 +439,23 @@ class TrackManager:
 			logger.debug(f"{s}No auto-flush task to stop")
 
 	async def _auto_flush(self):
-		logger.info(f"{s}Auto-flush loop starting with interval {self.flush_interval}s")
+		logger.info(f"{s}Auto-flush loop starting with fallback interval {self.flush_interval}s")
 		flush_count = 0
 
 		try:
 			while True:
-				await asyncio.sleep(self.flush_interval)
+				# Flush as soon as a batch is pending; under load the next flush starts right
+				# after the previous one, otherwise the fallback interval bounds staleness
+				try:
+					await asyncio.wait_for(self._flush_trigger.wait(), timeout=self.flush_interval)
+				except asyncio.TimeoutError:
+					pass
+				self._flush_trigger.clear()
 				flush_count += 1
 
 				with PerformanceLogger(logger, f"auto-flush-{flush_count}"):
-					await self.flush_to_db()
+					# Shielded so stopping the loop lets a running flush finish instead of dropping its snapshot
+					await asyncio.shield(self.flush_to_db())
 
 		except asyncio.CancelledError:
 			logger.info(f"{s}Auto-flush loop cancelled after {flush_count} flushes")
@@ -236,114 +468,14 @@ class TrackManager:
 	# =========================
 	# Internal helpers
 	# =========================
-	async def _fetch_existing_docs(self, guild_id: str, user_ids: Set[str]) -> Dict[str, dict]:
-		"""
-        Batch-fetch existing docs for users in a guild to avoid N x find_one.
-        Returns a mapping user_id -> doc (partial).
-        """
-		if not user_ids:
-			logger.debug(f"{s}_fetch_existing_docs: No user_ids provided")
-			return {}
-
-		logger.debug(f"{s}_fetch_existing_docs: Fetching {len(user_ids)} users for guild {guild_id}")
-
-		try:
-			with PerformanceLogger(logger, f"fetch-existing-docs-{len(user_ids)}-users"):
-				cursor = self.collection.find(
-					{"guild_id": guild_id, "user_id": {"$in": list(user_ids)}},
-					{
-						"user_id": 1,
-						"message_stats.longest_message": 1,
-						"message_stats.daily_streak": 1,
-						"message_stats.streak_timestamp": 1,
-					},
-				)
-				result: Dict[str, dict] = {}
-				doc_count = 0
-				async for doc in cursor:
-					uid = doc.get("user_id")
-					if uid is not None:
-						result[str(uid)] = doc
-						doc_count += 1
-
-				logger.debug(f"{s}_fetch_existing_docs: Retrieved {doc_count} documents for guild {guild_id}")
-				return result
-
-		except Exception as e:
-			logger.error(f"{s}Error in _fetch_existing_docs: guild={guild_id}, user_count={len(user_ids)}, error={e}")
-			return {}
-
 	@staticmethod
 	def _merge_default_structure(guild_id: str, user_id: str, updates: dict) -> dict:
 		"""
         Merge updates with the default structure, preserving types.
         """
-		DEFAULT = {
-			"guild_id": guild_id,
-			"user_id": user_id,
-			"message_stats": {
-				"daily_streak": 0,
-				"last_message_time": 0.0,
-				"longest_message": 0,
-				"messages": 0,
-				"reacted_messages": 0,
-				"got_reactions": 0,
-				"streak_timestamp": 0.0,
-			},
-			"voice_stats": {
-				"active_seconds": 0.0,
-				"deafened_time": 0.0,
-				"muted_time": 0.0,
-				"self_deafened_time": 0.0,
-				"self_muted_time": 0.0,
-				"total_active_percentage": 0.0,
-				"total_unmuted_percentage": 0.0,
-				"voice_seconds": 0.0,
-				"voice_sessions": 0,
-			},
-			"last_rewarded": {
-				"message": 0.0,
-				"voice": 0.0,
-				"got_reaction": 0.0,
-				"give_reaction": 0.0,
-			},
-			"favorites": {},
-			"xp": 0,
-			"embers": 0,
-			"level": 0,
-		}
-
-		def deep_merge(template: dict, patch: dict) -> dict:
-			out = template.copy()
-			for k, v in patch.items():
-				if k in out and isinstance(out[k], dict) and isinstance(v, dict):
-					out[k] = deep_merge(out[k], v)
-				else:
-					out[k] = v
-			return out
-
-		return deep_merge(DEFAULT, updates)
-
-	@staticmethod
-	def _compute_streak(prev_streak: int, prev_ts: float, now_ts: float) -> Tuple[int, float]:
-		"""
-        Compute updated streak given previous streak and timestamp.
-        """
-		if not prev_ts:
-			return 1, now_ts
-		try:
-			current_date = datetime.fromtimestamp(now_ts, tz=timezone.utc).date()
-			last_date = datetime.fromtimestamp(prev_ts, tz=timezone.utc).date()
-			days_diff = (current_date - last_date).days
-			if days_diff == 1:
-				return max(0, prev_streak) + 1, now_ts
-			if days_diff > 1:
-				return 1, now_ts
-			return max(0, prev_streak), float(prev_ts)
-		except Exception as e:
-			logger.warning(
-				f"Error computing streak: prev_streak={prev_streak}, prev_ts={prev_ts}, now_ts={now_ts}, error={e}")
-			return 1, now_ts
+		out = {"guild_id": guild_id, "user_id": user_id, **_thaw(_DEFAULT_TEMPLATE)}
+		_apply_patch(out, updates)
+		return out
 
 	# =========================
 	# Flush to DB
@@ -354,26 +486,30 @@ class TrackManager:
 		async with self._flush_lock:
 			start_time = time.time()
 
+			# Detach this window's caches; increments landing during the flush go to fresh ones
+			snapshot = self._swap_caches()
+			message_cache = snapshot["message_cache"]
+			voice_cache = snapshot["voice_cache"]
+			message_length_cache = snapshot["message_length_cache"]
+			last_message_time = snapshot["last_message_time"]
+			reacted_messages_cache = snapshot["reacted_messages_cache"]
+			got_reactions_cache = snapshot["got_reactions_cache"]
+			emoji_favorites_cache = snapshot["emoji_favorites_cache"]
+			voice_stats_cache = snapshot["voice_stats_cache"]
+			active_users = snapshot["_active_users"]
+
 			# Log cache sizes before flush
 			cache_stats = {
-				'messages': sum(len(guild_users) for guild_users in self.message_cache.values()),
-				'voice': sum(len(guild_users) for guild_users in self.voice_cache.values()),
-				'voice_detailed': len(self.voice_stats_cache),
-				'reactions': sum(len(guild_users) for guild_users in self.reacted_messages_cache.values()),
-				'emojis': sum(len(guild_users) for guild_users in self.emoji_favorites_cache.values())
+				'messages': len(message_cache),
+				'voice': len(voice_cache),
+				'voice_detailed': len(voice_stats_cache),
+				'reactions': len(reacted_messages_cache),
+				'emojis': sum(len(user_favs) for user_favs in emoji_favorites_cache.values())
 			}
 
 			logger.info(f"{s}Starting flush_to_db - Cache stats: {cache_stats}")
 
-			# Build guild and user sets from caches
-			all_guilds: Set[str] = (
-					set(self.message_cache.keys())
-					| set(self.voice_cache.keys())
-					| set(self.message_length_cache.keys())
-					| set(self.reacted_messages_cache.keys())
-					| set(self.got_reactions_cache.keys())
-					| {key.split(":")[0] for key in self.voice_stats_cache.keys()}
-			)
+			all_guilds: Set[str] = snapshot["_active_guilds"]
 
 			if not all_guilds:
 				logger.debug(f"{s}No cached data to flush")
@@ -383,180 +519,128 @@ class TrackManager:
 
 			now = _utc_ts()
 			total_ops = 0
-			operations_batch: List[UpdateOne] = []
+			staged_docs: List[dict] = []
+			# Full batches are merged in the background while the next one is built
+			inflight: List[asyncio.Task] = []
+			# Users whose batch reached Users; on failure only the rest are handed back to the caches
+			committed: Set[Tuple[str, str]] = set()
+			commit_slots = asyncio.Semaphore(self.max_inflight_commits)
 			guild_stats = {}
 
+			# Large flushes insert plain batches into TrackStage and merge them with one aggregate
+			total_users = sum(len(users) for users in active_users.values())
+			flush_id = ObjectId() if total_users > self.stage_threshold else None
+			if flush_id is not None:
+				logger.info(f"{s}Staging {total_users} user documents through {self.stage.name}")
+
+			# Hoisted out of the per-user loop below
+			debug = logger.isEnabledFor(10)  # DEBUG level
+			batch_size = self.bulk_batch_size
+			message_get = message_cache.get
+			last_message_get = last_message_time.get
+			length_get = message_length_cache.get
+			reacted_get = reacted_messages_cache.get
+			got_reactions_get = got_reactions_cache.get
+			favorites_get = emoji_favorites_cache.get
+			voice_stats_get = voice_stats_cache.get
+			append = staged_docs.append
+
 			try:
+				await self._ensure_users_index()
+
 				for guild_id in all_guilds:
 					guild_start = time.time()
 
-					users: Set[str] = (
-							set(self.message_cache[guild_id].keys())
-							| set(self.voice_cache[guild_id].keys())
-							| set(self.message_length_cache[guild_id].keys())
-							| set(self.reacted_messages_cache[guild_id].keys())
-							| set(self.got_reactions_cache[guild_id].keys())
-							| {key.split(":")[1] for key in self.voice_stats_cache.keys() if
-							   key.startswith(f"{guild_id}:")}
-							| set(self.last_message_time[guild_id].keys())
-					)
+					users: Set[str] = active_users.get(guild_id, set())
 
 					if not users:
 						continue
 
 					logger.debug(f"{s}Processing guild {guild_id} with {len(users)} users")
 
-					# Batch fetch existing docs for streak/longest comparisons
-					existing_docs = await self._fetch_existing_docs(guild_id, users)
-
 					user_ops_count = 0
 					for user_id in users:
-						inc_updates: Dict[str, Any] = {}
-						set_updates: Dict[str, Any] = {}
-						max_updates: Dict[str, Any] = {}
-
-						# Streak: only compute if user had activity this window
-						had_activity = (
-								user_id in self.message_cache[guild_id]
-								or user_id in self.voice_cache[guild_id]
-						)
-						if had_activity:
-							prev_doc = existing_docs.get(user_id, {})
-							prev_ms = (prev_doc.get("message_stats") or {})
-							prev_streak = int(prev_ms.get("daily_streak", 0) or 0)
-							prev_ts = float(prev_ms.get("streak_timestamp", 0) or 0)
-							new_streak, new_ts = self._compute_streak(prev_streak, prev_ts, now)
-							set_updates["message_stats.daily_streak"] = new_streak
-							set_updates["message_stats.streak_timestamp"] = new_ts
-							# Also mirror in cache for quick reads
-							self.daily_streak_cache[guild_id][user_id] = new_streak
+						key = (guild_id, user_id)
+						message_delta: Dict[str, Any] = {}
+						voice_delta: Dict[str, Any] = {}
+
+						msg_count = message_get(key)
+						vs = voice_stats_get(key)
+
+						# Streak: stamp users active this window; the streak itself is advanced
+						# server-side by _MERGE_WHEN_MATCHED, and these are the values for new users
+						if msg_count is not None or key in voice_cache:
+							message_delta["daily_streak"] = 1
+							message_delta["streak_timestamp"] = now
 
 						# Message counters
-						if user_id in self.message_cache[guild_id]:
-							msg_count = int(self.message_cache[guild_id][user_id])
-							inc_updates["message_stats.messages"] = msg_count
-							logger.debug(f"{s}User {user_id} message increment: {msg_count}")
-
-						if user_id in self.last_message_time[guild_id]:
-							set_updates["message_stats.last_message_time"] = float(
-								self.last_message_time[guild_id][user_id]
-							)
-
-						if user_id in self.message_length_cache[guild_id]:
-							# Use $max directly to avoid an extra read/compare
-							max_updates["message_stats.longest_message"] = int(
-								self.message_length_cache[guild_id][user_id]
-							)
-
-						if user_id in self.reacted_messages_cache[guild_id]:
-							inc_updates["message_stats.reacted_messages"] = int(
-								self.reacted_messages_cache[guild_id][user_id]
-							)
-
-						if user_id in self.got_reactions_cache[guild_id]:
-							inc_updates["message_stats.got_reactions"] = int(
-								self.got_reactions_cache[guild_id][user_id]
-							)
+						if msg_count is not None:
+							message_delta["messages"] = msg_count
+							if debug:
+								logger.debug(f"{s}User {user_id} message increment: {msg_count}")
 
-						# Emoji favorites
-						user_emoji_counts = (self.emoji_favorites_cache.get(guild_id, {}) or {}).get(user_id, {})
-						if user_emoji_counts:
-							emoji_count = sum(user_emoji_counts.values())
-							logger.debug(
-								f"{s}User {user_id} emoji updates: {len(user_emoji_counts)} types, {emoji_count} total")
+						value = last_message_get(key)
+						if value is not None:
+							message_delta["last_message_time"] = value
+
+						value = length_get(key)
+						if value is not None:
+							message_delta["longest_message"] = value
 
-						for emoji, count in user_emoji_counts.items():
-							inc_updates[f"favorites.{emoji}"] = int(count)
+						value = reacted_get(key)
+						if value is not None:
+							message_delta["reacted_messages"] = value
+
+						value = got_reactions_get(key)
+						if value is not None:
+							message_delta["got_reactions"] = value
+
+						# Emoji favorites
+						user_emoji_counts = favorites_get(key, {})
+						if debug and user_emoji_counts:
+							logger.debug(f"{s}User {user_id} emoji updates: {len(user_emoji_counts)} types, "
+										 f"{sum(user_emoji_counts.values())} total")
 
 						# Voice stats
-						key = f"{guild_id}:{user_id}"
-						if key in self.voice_stats_cache:
-							vs = self.voice_stats_cache[key]
-							voice_seconds = float(vs.get("active_seconds", 0) or 0)
-
-							logger.debug(f"{s}User {user_id} voice update: {voice_seconds}s active, "
-										 f"{vs.get('sessions', 0)} sessions")
-
-							inc_updates.update({
-								"voice_stats.voice_seconds": voice_seconds,
-								"voice_stats.active_seconds": float(vs.get("active_seconds", 0) or 0),
-								"voice_stats.muted_time": float(vs.get("muted_time", 0) or 0),
-								"voice_stats.deafened_time": float(vs.get("deafened_time", 0) or 0),
-								"voice_stats.self_muted_time": float(vs.get("self_muted_time", 0) or 0),
-								"voice_stats.self_deafened_time": float(vs.get("self_deafened_time", 0) or 0),
-								"voice_stats.voice_sessions": 1,
+						if vs is not None:
+							voice_seconds = vs.active_seconds
+
+							if debug:
+								logger.debug(f"{s}User {user_id} voice update: {voice_seconds}s active, "
+											 f"{vs.sessions} sessions")
+
+							voice_delta.update({
+								"voice_seconds": voice_seconds,
+								"active_seconds": voice_seconds,
+								"muted_time": vs.muted_time,
+								"deafened_time": vs.deafened_time,
+								"self_muted_time": vs.self_muted_time,
+								"self_deafened_time": vs.self_deafened_time,
+								"voice_sessions": 1,
+								**vs.averages(),
 							})
-							# Running averages (set)
-							if int(vs.get("sessions", 0) or 0) > 0:
-								set_updates.update({
-									"voice_stats.total_active_percentage": float(
-										vs.get("total_active_percentage", 0) or 0),
-									"voice_stats.total_unmuted_percentage": float(
-										vs.get("total_unmuted_percentage", 0) or 0),
-								})
-
-						# Build full flattened setOnInsert baseline
-						set_on_insert_full: Dict[str, Any] = {
+
+						# Stage only this window's deltas; _FILL_DEFAULTS completes the document
+						# server-side before it is inserted or combined by _MERGE_WHEN_MATCHED
+						append({
 							"guild_id": guild_id,
 							"user_id": user_id,
-							"xp": 0,
-							"embers": 0,
-							"level": 0,
-
-							# message_stats primitives (flattened)
-							"message_stats.daily_streak": 0,
-							"message_stats.streak_timestamp": 0.0,
-							"message_stats.messages": 0,
-							"message_stats.longest_message": 0,
-							"message_stats.reacted_messages": 0,
-							"message_stats.got_reactions": 0,
-							"message_stats.last_message_time": 0.0,
-
-							# voice_stats primitives (flattened)
-							"voice_stats.voice_seconds": 0.0,
-							"voice_stats.active_seconds": 0.0,
-							"voice_stats.muted_time": 0.0,
-							"voice_stats.deafened_time": 0.0,
-							"voice_stats.self_muted_time": 0.0,
-							"voice_stats.self_deafened_time": 0.0,
-							"voice_stats.total_active_percentage": 0.0,
-							"voice_stats.total_unmuted_percentage": 0.0,
-							"voice_stats.voice_sessions": 0,
-
-							# last_rewarded primitives (flattened)
-							"last_rewarded.message": 0.0,
-							"last_rewarded.voice": 0.0,
-							"last_rewarded.got_reaction": 0.0,
-							"last_rewarded.give_reaction": 0.0,
-						}
-
-						# Prune any paths that appear in other operators to avoid conflicts
-						conflict_paths = set(inc_updates.keys()) | set(set_updates.keys()) | set(max_updates.keys())
-						set_on_insert = {k: v for k, v in set_on_insert_full.items() if k not in conflict_paths}
-
-						# Assemble update
-						update_doc: Dict[str, Any] = {}
-						if inc_updates:
-							update_doc["$inc"] = inc_updates
-						if set_updates:
-							update_doc["$set"] = set_updates
-						if max_updates:
-							update_doc["$max"] = max_updates
-						if set_on_insert:
-							update_doc["$setOnInsert"] = set_on_insert
-
-						if update_doc:
-							operations_batch.append(
-								UpdateOne({"guild_id": guild_id, "user_id": user_id}, update_doc, upsert=True)
-							)
-							user_ops_count += 1
-
-						# Bulk in chunks
-						if len(operations_batch) >= self.bulk_batch_size:
-							logger.debug(f"{s}Executing bulk batch of {len(operations_batch)} operations")
-							await self._commit_bulk(operations_batch)
-							total_ops += len(operations_batch)
-							operations_batch.clear()
+							"message_stats": message_delta,
+							"voice_stats": voice_delta,
+							"favorites": user_emoji_counts,
+						})
+						user_ops_count += 1
+
+						# Merge in chunks
+						if len(staged_docs) >= batch_size:
+							logger.debug(f"{s}Dispatching merge batch of {len(staged_docs)} documents")
+							inflight.append(asyncio.create_task(
+								self._commit_bounded(commit_slots, staged_docs, flush_id, committed)))
+							total_ops += len(staged_docs)
+							staged_docs = []
+							append = staged_docs.append
+							# Let the batch reach the server before building the next one
+							await asyncio.sleep(0)
 
 					guild_elapsed = time.time() - guild_start
 					guild_stats[guild_id] = {
@@ -569,104 +653,233 @@ class TrackManager:
 								 f"{user_ops_count} ops, {guild_elapsed:.2f}s")
 
 				# Commit remaining
-				if operations_batch:
-					logger.debug(f"{s}Executing final bulk batch of {len(operations_batch)} operations")
-					await self._commit_bulk(operations_batch)
-					total_ops += len(operations_batch)
-					operations_batch.clear()
+				if staged_docs:
+					logger.debug(f"{s}Dispatching final merge batch of {len(staged_docs)} documents")
+					inflight.append(asyncio.create_task(
+						self._commit_bounded(commit_slots, staged_docs, flush_id, committed)))
+					total_ops += len(staged_docs)
+					staged_docs = []
 
-				# Clear caches after successful flush
-				self._clear_caches()
+			except Exception as e:
+				logger.error(f"{s}flush_to_db failed after {time.time() - start_time:.3f}s: {e}")
 
-				elapsed = time.time() - start_time
+			# Wait out every dispatched batch so none can still land after the window is restored
+			if inflight:
+				await asyncio.gather(*inflight, return_exceptions=True)
 
-				# Detailed completion log
-				logger.info(
-					f"{s}Flush completed successfully:"
-					f"\n{s}  - Total operations: {total_ops}"
-					f"\n{s}  - Guilds processed: {len(all_guilds)}"
-					f"\n{s}  - Total elapsed: {elapsed:.3f}s"
-					f"\n{s}  - Ops/second: {total_ops / elapsed:.1f}" if elapsed > 0 else ""
-				)
+			# Staged users only reach Users once the merge succeeds
+			if flush_id is not None and committed:
+				try:
+					await self._merge_stage(flush_id)
+				except Exception:
+					committed.clear()
 
-				# Per-guild breakdown for debug
-				if logger.isEnabledFor(10):  # DEBUG level
-					for guild_id, stats in guild_stats.items():
-						logger.debug(f"{s}Guild {guild_id}: {stats['users']} users, "
-									 f"{stats['operations']} ops, {stats['elapsed_ms']}ms")
+			elapsed = time.time() - start_time
 
-			except Exception as e:
-				elapsed = time.time() - start_time
-				logger.error(f"{s}flush_to_db failed after {elapsed:.3f}s: {e}")
+			if len(committed) < total_users:
+				logger.error(f"{s}Flush incomplete after {elapsed:.3f}s: "
+							 f"{total_users - len(committed)} of {total_users} users not written")
 				logger.error(f"{s}Operations attempted: {total_ops}, Cache stats: {cache_stats}")
+				# Hand the unwritten users back to the live caches so the next flush cycle retries them
+				self._restore_caches(snapshot, committed)
 				# Don't re-raise to allow next flush cycle to retry
+				return
+
+			# Detailed completion log
+			logger.info(
+				f"{s}Flush completed successfully:"
+				f"\n{s}  - Total operations: {total_ops}"
+				f"\n{s}  - Guilds processed: {len(all_guilds)}"
+				f"\n{s}  - Total elapsed: {elapsed:.3f}s"
+				f"\n{s}  - Ops/second: {total_ops / elapsed:.1f}" if elapsed > 0 else ""
+			)
 
-	async def _commit_bulk(self, ops: List[UpdateOne]):
-		"""Execute bulk write operations with detailed logging."""
-		if not ops:
-			logger.warning(f"{s}_commit_bulk called with empty operations list")
+			# Per-guild breakdown for debug
+			if logger.isEnabledFor(10):  # DEBUG level
+				for guild_id, stats in guild_stats.items():
+					logger.debug(f"{s}Guild {guild_id}: {stats['users']} users, "
+								 f"{stats['operations']} ops, {stats['elapsed_ms']}ms")
+
+	async def _commit_bounded(self, slots: asyncio.Semaphore, docs: List[dict], flush_id: ObjectId | None,
+							  committed: Set[Tuple[str, str]]):
+		"""Merge a batch, or stage it when flush_id is set, once a commit slot is free; record its users on success."""
+		async with slots:
+			if flush_id is None:
+				await self._commit_bulk(docs)
+			else:
+				await self._stage_batch(docs, flush_id)
+		committed.update((doc["guild_id"], doc["user_id"]) for doc in docs)
+
+	async def _ensure_users_index(self):
+		"""Create the unique (guild_id, user_id) Users index once; $merge cannot match documents without it."""
+		if self._users_index_ready:
+			return
+		indexes = await self.collection.index_information()
+		if not any(
+				info.get("unique") and {field for field, _ in info["key"]} == set(_MERGE_ON)
+				for info in indexes.values()
+		):
+			try:
+				await self.collection.create_index(
+					[(field, 1) for field in _MERGE_ON], unique=True, name="guild_user_unique"
+				)
+			except Exception as e:
+				# Usually duplicate (guild_id, user_id) documents; no flush can be merged until they are removed
+				logger.error(f"{s}Cannot create unique (guild_id, user_id) index on {self.collection.name}, "
+							 f"flushes will keep failing until it exists: {e}")
+				raise
+			logger.info(f"{s}Created unique (guild_id, user_id) index on {self.collection.name}")
+		self._users_index_ready = True
+
+	async def _ensure_stage_index(self):
+		"""Create the TrackStage TTL index once so abandoned staged documents are cleaned up."""
+		if self._stage_index_ready:
 			return
+		await self.stage.create_index(
+			[("created_at", 1)], name="created_at_ttl", expireAfterSeconds=_STAGE_TTL_SECONDS
+		)
+		self._stage_index_ready = True
 
+	async def _stage_batch(self, docs: List[dict], flush_id: ObjectId):
+		"""Insert a batch of delta documents into TrackStage under this flush's id."""
 		operation_start = time.time()
+		try:
+			await self._ensure_stage_index()
+			created_at = datetime.now(timezone.utc)
+			for doc in docs:
+				doc["flush_id"] = flush_id
+				doc["created_at"] = created_at
+			# Encode while earlier batches are still in flight; the driver sends raw documents as-is
+			raw_docs = await asyncio.get_running_loop().run_in_executor(None, _encode_batch, docs)
+			await self.stage.insert_many(raw_docs, ordered=False, bypass_document_validation=True)
+			logger.debug(f"{s}Staged {len(docs)} documents in {time.time() - operation_start:.3f}s")
+		except Exception as e:
+			logger.error(f"{s}Staging failed: docs={len(docs)}, elapsed={time.time() - operation_start:.3f}s, error={e}")
+			raise
 
+	async def _merge_stage(self, flush_id: ObjectId):
+		"""Merge one flush's staged documents into the Users collection and drop them from TrackStage."""
+		operation_start = time.time()
 		try:
-			with PerformanceLogger(logger, f"bulk-write-{len(ops)}-ops"):
-				result = await self.collection.bulk_write(ops, ordered=False)
+			with PerformanceLogger(logger, f"merge-stage-{flush_id}"):
+				pipeline = [
+					{"$match": {"flush_id": flush_id}},
+					{"$unset": ["_id", "flush_id", "created_at"]},
+					_FILL_DEFAULTS,
+					{"$merge": {
+						"into": self.collection.name,
+						"on": list(_MERGE_ON),
+						"whenMatched": _MERGE_WHEN_MATCHED,
+						"whenNotMatched": "insert",
+					}},
+				]
+				await self.stage.aggregate(
+					pipeline, bypassDocumentValidation=True, comment="track-flush"
+				).to_list(None)
+			logger.info(f"{s}Staged merge completed in {time.time() - operation_start:.3f}s")
+		except Exception as e:
+			logger.error(f"{s}Staged merge failed after {time.time() - operation_start:.3f}s: {e}")
+			raise
+		try:
+			await self.stage.delete_many({"flush_id": flush_id})
+		except Exception as e:
+			# The merge already landed; the TTL index clears these documents later
+			logger.warning(f"{s}Could not drop staged documents for flush {flush_id}: {e}")
+
+	async def _commit_bulk(self, docs: List[dict]):
+		"""Merge staged user documents into the Users collection with one server-side aggregate."""
+		if not docs:
+			logger.warning(f"{s}_commit_bulk called with empty document list")
+			return
+
+		operation_start = time.time()
+
+		try:
+			with PerformanceLogger(logger, f"merge-{len(docs)}-docs"):
+				pipeline = [
+					{"$documents": docs},
+					_FILL_DEFAULTS,
+					{"$merge": {
+						"into": self.collection.name,
+						"on": list(_MERGE_ON),
+						"whenMatched": _MERGE_WHEN_MATCHED,
+						"whenNotMatched": "insert",
+					}},
+				]
+				await self.db.aggregate(
+					pipeline, bypassDocumentValidation=True, comment="track-flush"
+				).to_list(None)
 
 				operation_elapsed = time.time() - operation_start
 
 				logger.info(
-					f"{s}Bulk write completed: "
-					f"ops={len(ops)}, matched={result.matched_count}, "
-					f"modified={result.modified_count}, upserted={len(result.upserted_ids)}, "
-					f"elapsed={operation_elapsed:.3f}s"
+					f"{s}Merge completed: docs={len(docs)}, elapsed={operation_elapsed:.3f}s"
 				)
 
-				# Log operation details at debug level
 				if logger.isEnabledFor(10):  # DEBUG level
-					inc_ops = sum(1 for op in ops if "$inc" in getattr(op, "_doc", {}))
-					set_ops = sum(1 for op in ops if "$set" in getattr(op, "_doc", {}))
-					max_ops = sum(1 for op in ops if "$max" in getattr(op, "_doc", {}))
-
-					logger.debug(
-						f"{s}Operation breakdown: $inc={inc_ops}, $set={set_ops}, $max={max_ops}, "
-						f"throughput={len(ops) / operation_elapsed:.1f} ops/s"
-					)
+					logger.debug(f"{s}Merge throughput={len(docs) / operation_elapsed:.1f} docs/s")
 
 		except Exception as e:
 			operation_elapsed = time.time() - operation_start
 			logger.error(
-				f"{s}Bulk write failed: ops={len(ops)}, elapsed={operation_elapsed:.3f}s, error={e}"
+				f"{s}Merge failed: docs={len(docs)}, elapsed={operation_elapsed:.3f}s, error={e}"
 			)
-			# Log some operation details for debugging
-			if len(ops) > 0:
-				sample_op = ops[0]
-				sample_filter = getattr(sample_op, "_filter", {})
-				sample_doc = getattr(sample_op, "_doc", {})
-				logger.error(f"{s}Sample operation - filter: {sample_filter}, doc keys: {list(sample_doc.keys())}")
-
-	def _clear_caches(self):
-		"""Clear all caches with logging."""
-		cache_counts = {
-			'message_cache': sum(len(users) for users in self.message_cache.values()),
-			'voice_cache': sum(len(users) for users in self.voice_cache.values()),
-			'voice_stats_cache': len(self.voice_stats_cache),
-			'emoji_favorites_cache': sum(len(users) for users in self.emoji_favorites_cache.values())
-		}
-
-		logger.debug(f"{s}Clearing caches - counts before clear: {cache_counts}")
-
-		self.message_cache.clear()
-		self.voice_cache.clear()
-		self.message_length_cache.clear()
-		self.last_message_time.clear()
-		self.daily_streak_cache.clear()
-		self.reacted_messages_cache.clear()
-		self.got_reactions_cache.clear()
-		self.voice_stats_cache.clear()
-		self.emoji_favorites_cache.clear()
+			# Log a sample document for debugging
+			sample_doc = docs[0]
+			logger.error(f"{s}Sample document - guild={sample_doc.get('guild_id')}, "
+						 f"user={sample_doc.get('user_id')}, keys: {list(sample_doc.keys())}")
+			raise
 
-		logger.debug(f"{s}All caches cleared successfully")
+	# Caches detached by _swap_caches and merged back by _restore_caches
+	_CACHE_ATTRS = (
+		"message_cache",
+		"voice_cache",
+		"message_length_cache",
+		"last_message_time",
+		"reacted_messages_cache",
+		"got_reactions_cache",
+		"emoji_favorites_cache",
+		"voice_stats_cache",
+		"_active_guilds",
+		"_active_users",
+	)
+
+	def _swap_caches(self) -> Dict[str, Any]:
+		"""Replace every cache with an empty one and return the detached caches by attribute name."""
+		snapshot = {name: getattr(self, name) for name in self._CACHE_ATTRS}
+		for name, cache in snapshot.items():
+			fresh = defaultdict(cache.default_factory) if isinstance(cache, defaultdict) else type(cache)()
+			setattr(self, name, fresh)
+		self._pending_users = 0
+		logger.debug(f"{s}Detached caches for flush: {len(snapshot['_active_guilds'])} guilds")
+		return snapshot
+
+	def _restore_caches(self, snapshot: Dict[str, Any], committed: Set[Tuple[str, str]] = frozenset()):
+		"""Merge caches detached by a failed flush back into the live ones, skipping users already written."""
+
+		def unwritten(cache):
+			return {key: value for key, value in cache.items() if key not in committed}
+
+		for name in ("message_cache", "voice_cache", "reacted_messages_cache", "got_reactions_cache"):
+			getattr(self, name).update(unwritten(snapshot[name]))
+		for key, user_favs in unwritten(snapshot["emoji_favorites_cache"]).items():
+			live_favs = self.emoji_favorites_cache.setdefault(key, user_favs)
+			if live_favs is not user_favs:
+				live_favs.update(user_favs)
+		for name in ("message_length_cache", "last_message_time"):
+			live = getattr(self, name)
+			for key, value in unwritten(snapshot[name]).items():
+				live[key] = max(live.get(key, value), value)
+		for key, metrics in unwritten(snapshot["voice_stats_cache"]).items():
+			live_metrics = self.voice_stats_cache.setdefault(key, metrics)
+			if live_metrics is not metrics:
+				live_metrics.merge(metrics)
+		for guild_id, users in snapshot["_active_users"].items():
+			users = {user_id for user_id in users if (guild_id, user_id) not in committed}
+			if users:
+				self._active_users[guild_id] |= users
+				self._active_guilds.add(guild_id)
+		self._pending_users = sum(len(users) for users in self._active_users.values())
 
 	# =========================
 	# Reporting
@@ -677,25 +890,28 @@ class TrackManager:
         """
 		logger.debug(f"{s}get_stats_per_guild called")
 
-		stats: List[dict] = []
-		guild_ids = set(
-			list(self.message_cache.keys()) +
-			list(self.voice_cache.keys()) +
-			list(self.message_length_cache.keys()) +
-			list(self.daily_streak_cache.keys())
-		)
+		by_guild: Dict[str, dict] = {}
 
-		for guild_id in guild_ids:
-			guild_stats = {
-				"guild_id": guild_id,
-				"messages": sum(self.message_cache[guild_id].values()) if guild_id in self.message_cache else 0,
-				"voice_seconds": sum(self.voice_cache[guild_id].values()) if guild_id in self.voice_cache else 0.0,
-				"longest_message": max(self.message_length_cache[guild_id].values(), default=0)
-				if guild_id in self.message_length_cache else 0,
-				"daily_streak": max(self.daily_streak_cache[guild_id].values(), default=0)
-				if guild_id in self.daily_streak_cache else 0,
-			}
-			stats.append(guild_stats)
+		def guild_entry(guild_id: str) -> dict:
+			entry = by_guild.get(guild_id)
+			if entry is None:
+				entry = by_guild[guild_id] = {
+					"guild_id": guild_id,
+					"messages": 0,
+					"voice_seconds": 0.0,
+					"longest_message": 0,
+				}
+			return entry
+
+		for (guild_id, _), count in self.message_cache.items():
+			guild_entry(guild_id)["messages"] += count
+		for (guild_id, _), seconds in self.voice_cache.items():
+			guild_entry(guild_id)["voice_seconds"] += seconds
+		for (guild_id, _), length in self.message_length_cache.items():
+			entry = guild_entry(guild_id)
+			entry["longest_message"] = max(entry["longest_message"], length)
+
+		stats: List[dict] = list(by_guild.values())
 
 		logger.debug(f"{s}get_stats_per_guild returning stats for {len(stats)} guilds")
 		return stats
@@ -715,12 +931,15 @@ class TrackManager:
 
         Returns a complete document-like dict (with defaults) for the user.
         """
-		logger.debug(
-			f"{s}get_user_stats called: guild={guild_id}, user={user_id}, flush={flush}, include_cache={include_cache}")
+		debug = logger.isEnabledFor(10)  # DEBUG level; checked once so skipped messages are never formatted
+		if debug:
+			logger.debug(f"{s}get_user_stats called: guild={guild_id}, user={user_id}, "
+						 f"flush={flush}, include_cache={include_cache}")
 
 		try:
 			if flush:
-				logger.debug(f"{s}Performing flush before user stats retrieval")
+				if debug:
+					logger.debug(f"{s}Performing flush before user stats retrieval")
 				# Ensure the DB reflects the latest aggregates before reading
 				await self.flush_to_db()
 		except Exception as e:
@@ -732,10 +951,12 @@ class TrackManager:
 				doc = await self.collection.find_one({"guild_id": guild_id, "user_id": user_id})
 
 			if not doc:
-				logger.debug(f"{s}No existing document found for user {user_id}, creating default structure")
+				if debug:
+					logger.debug(f"{s}No existing document found for user {user_id}, creating default structure")
 				doc = self._merge_default_structure(guild_id, user_id, {})
 			else:
-				logger.debug(f"{s}Found existing document for user {user_id}")
+				if debug:
+					logger.debug(f"{s}Found existing document for user {user_id}")
 
 		except Exception as e:
 			logger.error(f"{s}Database error fetching user stats for {user_id}: {e}")
@@ -743,84 +964,74 @@ class TrackManager:
 			doc = self._merge_default_structure(guild_id, user_id, {})
 
 		if not include_cache:
-			logger.debug(f"{s}Returning user stats without cache overlay")
+			if debug:
+				logger.debug(f"{s}Returning user stats without cache overlay")
+			return doc
+
+		# Counters are added server-side on flush, so the overlay only matters for activity still
+		# cached; after a flush (the default) the user usually has none
+		if user_id not in self._active_users.get(guild_id, ()):
+			if debug:
+				logger.debug(f"{s}No cached activity for user {user_id}, skipping cache overlay")
 			return doc
 
 		# Overlay cached values to reflect real-time deltas without creating new cache keys
 		try:
-			logger.debug(f"{s}Applying cache overlay for user {user_id}")
-
-			# Safe reads from defaultdict caches without mutating them
-			msg_cache_g = self.message_cache.get(guild_id, {})
-			voice_cache_g = self.voice_cache.get(guild_id, {})
-			msg_len_cache_g = self.message_length_cache.get(guild_id, {})
-			last_msg_time_g = self.last_message_time.get(guild_id, {})
-			streak_cache_g = self.daily_streak_cache.get(guild_id, {})
-			reacted_cache_g = self.reacted_messages_cache.get(guild_id, {})
-			got_react_cache_g = self.got_reactions_cache.get(guild_id, {})
-			emoji_fav_g = self.emoji_favorites_cache.get(guild_id, {})
+			if debug:
+				logger.debug(f"{s}Applying cache overlay for user {user_id}")
+
+			# Safe reads from the caches without mutating them
+			key = (guild_id, user_id)
 
 			# Message stats overlay
 			ms = doc.setdefault("message_stats", {})
-			cached_messages = int(msg_cache_g.get(user_id, 0))
-			if cached_messages > 0:
+			# Cached values are already typed; only stored fields keep 'or 0' guards for null values
+			ms_get = ms.get
+			cached_messages = self.message_cache.get(key, 0)
+			if debug and cached_messages > 0:
 				logger.debug(f"{s}User {user_id} has {cached_messages} cached messages")
 
-			ms["messages"] = int(ms.get("messages", 0)) + cached_messages
-			ms["reacted_messages"] = int(ms.get("reacted_messages", 0)) + int(reacted_cache_g.get(user_id, 0))
-			ms["got_reactions"] = int(ms.get("got_reactions", 0)) + int(got_react_cache_g.get(user_id, 0))
-
-			cached_longest = int(msg_len_cache_g.get(user_id, 0) or 0)
-			ms["longest_message"] = max(int(ms.get("longest_message", 0) or 0), cached_longest)
-
-			cached_last_ts = float(last_msg_time_g.get(user_id, 0.0) or 0.0)
-			ms["last_message_time"] = max(float(ms.get("last_message_time", 0.0) or 0.0), cached_last_ts)
-
-			# If we computed a new streak in cache, prefer it for quick reads
-			cached_streak = int(streak_cache_g.get(user_id, 0) or 0)
-			if cached_streak > 0:
-				ms["daily_streak"] = cached_streak
+			ms["messages"] = (ms_get("messages") or 0) + cached_messages
+			ms["reacted_messages"] = (ms_get("reacted_messages") or 0) + self.reacted_messages_cache.get(key, 0)
+			ms["got_reactions"] = (ms_get("got_reactions") or 0) + self.got_reactions_cache.get(key, 0)
+			ms["longest_message"] = max(ms_get("longest_message") or 0, self.message_length_cache.get(key, 0))
+			ms["last_message_time"] = max(ms_get("last_message_time") or 0.0, self.last_message_time.get(key, 0.0))
 
 			# Favorites overlay (incremental)
 			fav = doc.setdefault("favorites", {})
-			user_favs = (emoji_fav_g.get(user_id, {}) or {})
-			if user_favs:
-				logger.debug(f"{s}User {user_id} has {len(user_favs)} cached favorite emojis")
-			for emoji, cnt in user_favs.items():
-				fav[emoji] = int(fav.get(emoji, 0)) + int(cnt or 0)
+			user_favs = self.emoji_favorites_cache.get(key, {})
+			if not fav:
+				# Nothing stored to add to; take the cached counts in one merge
+				fav.update(user_favs)
+			else:
+				fav_get = fav.get
+				for emoji, cnt in user_favs.items():
+					fav[emoji] = (fav_get(emoji) or 0) + cnt
 
 			# Voice overlay
 			vs_doc = doc.setdefault("voice_stats", {})
-			cached_voice = float(voice_cache_g.get(user_id, 0.0) or 0.0)
-			if cached_voice > 0:
+			vsd_get = vs_doc.get
+			cached_voice = self.voice_cache.get(key, 0.0)
+			if debug and cached_voice > 0:
 				logger.debug(f"{s}User {user_id} has {cached_voice:.1f} cached voice seconds")
 
 			# Aggregate voice_seconds based on coarse and detailed caches
-			vs_doc["voice_seconds"] = float(vs_doc.get("voice_seconds", 0.0) or 0.0) + cached_voice
-
-			key = f"{guild_id}:{user_id}"
-			if key in self.voice_stats_cache:
-				vs = self.voice_stats_cache[key]
-				# Add deltas for detailed metrics
-				vs_doc["active_seconds"] = float(vs_doc.get("active_seconds", 0.0) or 0.0) + float(
-					vs.get("active_seconds", 0.0) or 0.0)
-				vs_doc["muted_time"] = float(vs_doc.get("muted_time", 0.0) or 0.0) + float(
-					vs.get("muted_time", 0.0) or 0.0)
-				vs_doc["deafened_time"] = float(vs_doc.get("deafened_time", 0.0) or 0.0) + float(
-					vs.get("deafened_time", 0.0) or 0.0)
-				vs_doc["self_muted_time"] = float(vs_doc.get("self_muted_time", 0.0) or 0.0) + float(
-					vs.get("self_muted_time", 0.0) or 0.0)
-				vs_doc["self_deafened_time"] = float(vs_doc.get("self_deafened_time", 0.0) or 0.0) + float(
-					vs.get("self_deafened_time", 0.0) or 0.0)
-				vs_doc["voice_sessions"] = int(vs_doc.get("voice_sessions", 0) or 0) + int(
-					vs.get("sessions", 0) or 0)
+			vs_doc["voice_seconds"] = (vsd_get("voice_seconds") or 0.0) + cached_voice
+
+			vs = self.voice_stats_cache.get(key)
+			if vs is not None:
+				# Add deltas for detailed metrics; stored fields may still be null on old documents
+				for field, cached in zip(_VOICE_TIME_FIELDS, _voice_times(vs)):
+					vs_doc[field] = (vsd_get(field) or 0.0) + cached
+				sessions = vs.sessions
+				vs_doc["voice_sessions"] = (vsd_get("voice_sessions") or 0) + sessions
 
 				# For percentages we mirror the running average from the session cache if available
-				if int(vs.get("sessions", 0) or 0) > 0:
-					vs_doc["total_active_percentage"] = float(vs.get("total_active_percentage", 0.0) or 0.0)
-					vs_doc["total_unmuted_percentage"] = float(vs.get("total_unmuted_percentage", 0.0) or 0.0)
+				if sessions > 0:
+					vs_doc.update(vs.averages())
 
-			logger.debug(f"{s}Cache overlay completed for user {user_id}")
+			if debug:
+				logger.debug(f"{s}Cache overlay completed for user {user_id}")
 
 		except Exception as e:
 			logger.error(f"{s}get_user_stats overlay error for user {user_id}: {e}")
@@ -835,22 +1046,26 @@ class TrackManager:
 		"""Perform a final flush of all caches and cleanup on shutdown"""
 		logger.info(f"{s}🔄 Starting TrackManager cleanup...")
 
+		# Stop the loop first so it cannot start another flush alongside the final one
+		if self._flush_task:
+			logger.info(f"{s}Stopping auto-flush task...")
+			self.stop_auto_flush()
+
 		try:
 			logger.info(f"{s}Performing final cache flush before shutdown...")
 			with PerformanceLogger(logger, "final-cleanup-flush"):
-				await self.flush_to_db()
+				await asyncio.wait_for(self.flush_to_db(), timeout=_SHUTDOWN_FLUSH_TIMEOUT)
 			logger.info(f"{s}Final cache flush completed successfully")
 
+		except asyncio.TimeoutError:
+			logger.error(f"{s}Final cache flush timed out after {_SHUTDOWN_FLUSH_TIMEOUT}s; unflushed activity is lost")
 		except Exception as e:
 			logger.error(f"{s}Error during final cache flush: {e}")
 		finally:
 			try:
-				if self._flush_task:
-					logger.info(f"{s}Stopping auto-flush task...")
-					self.stop_auto_flush()
-
 				logger.info(f"{s}Closing MongoDB client...")
-				self.mongo_client.close()
+				# Socket teardown is blocking; keep it off the event loop
+				await asyncio.to_thread(self.mongo_client.close)
 				logger.info(f"{s}MongoDB client closed successfully")
 
 			except Exception as e:
@@ -858,5 +1073,4 @@ class TrackManager:
 
 		logger.info(f"{s}TrackManager cleanup completed")
 
-
 track_manager = TrackManager()
\ No newline at end of file
@@ -1,12 +1,18 @@
 import asyncio
+import heapq
+import logging
 import os
 import re
-from typing import Dict, List, Optional, Tuple, Any
+import time
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple, Any
 from datetime import datetime, timedelta
 import discord
 from discord.ui import view
 from motor.motor_asyncio import AsyncIOMotorClient
-from fuzzywuzzy import fuzz, process
+from rapidfuzz import fuzz, process
 from utils.bot import bot
 from utils.logger import get_logger, PerformanceLogger
 from Database.DatabaseManager import db_manager
@@ -14,6 +20,87 @@ from Database.DatabaseManager import db_manager
 
 logger = get_logger("Guide")
 
+# Only the fields the guide renders or searches are fetched when building the menu index
+_GUIDE_MENU_PROJECTION = {
+	"name": 1, "description": 1, "meta_description": 1, "options": 1, "type": 1, "order": 1,
+	"channel_id": 1, "footer": 1, "thumbnail": 1, "_id": 0
+}
+
+# Per-user navigation state is bounded so a long-running bot does not grow without limit
+_MAX_BREADCRUMBS = 10_000
+_BREADCRUMB_TTL_SECONDS = 86400
+_MAX_ACCESS_USERS = 100_000
+# Trending counts are halved this often so old popularity fades and dead entries drop out
+_TRENDING_DECAY_SECONDS = 86400
+# Memoized smart_search / suggest_alternatives results kept per SearchEngine until the index is rebuilt
+_SEARCH_CACHE_SIZE = 1024
+
+# Keyword tokenizer and question punctuation stripper, compiled once for indexing and every search
+_WORD_RE = re.compile(r'\b\w+\b')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+# Related words that earn a semantic bonus when query and name both use the same group
+_SEMANTIC_GROUPS = {g: frozenset(ws) for g, ws in {
+	'music': ('music', 'song', 'audio', 'sound', 'tune', 'melody', 'beat'),
+	'bot': ('bot', 'command', 'automation', 'assistant'),
+	'game': ('game', 'play', 'gaming', 'player', 'match', 'competition'),
+	'server': ('server', 'discord', 'guild', 'community'),
+	'help': ('help', 'guide', 'tutorial', 'instruction', 'manual'),
+	'search': ('search', 'find', 'lookup', 'query')
+}.items()}
+
+# Word -> every word sharing a semantic group with it, for widening search candidates
+_SEMANTIC_RELATED = defaultdict(set)
+for _group_words in _SEMANTIC_GROUPS.values():
+	for _word in _group_words:
+		_SEMANTIC_RELATED[_word].update(_group_words)
+del _group_words, _word
+
+
+def _semantic_groups(words) -> frozenset:
+	"""Names of the semantic groups any of the given words belong to"""
+	return frozenset(group for group, group_words in _SEMANTIC_GROUPS.items() if not group_words.isdisjoint(words))
+
+
+def _extract_keywords(text: str) -> frozenset:
+	"""Extract important keywords from text"""
+	# Every word is kept for exact matches, so this is a superset of any stop-word filtered list
+	return frozenset(_WORD_RE.findall(text.lower()))
+
+
+# Popular queries repeat ("help", "music"); item texts are tokenized once at index time and skip this cache
+_query_keywords = lru_cache(maxsize=2048)(_extract_keywords)
+
+
+def _lru_get(cache: OrderedDict, key, compute):
+	"""Return cache[key], computing and storing it on a miss and evicting the least recently used entry"""
+	value = cache.get(key)
+	if value is None:
+		value = cache[key] = compute()
+		if len(cache) > _SEARCH_CACHE_SIZE:
+			cache.popitem(last=False)
+	else:
+		cache.move_to_end(key)
+	return value
+
+
+@dataclass(slots=True)
+class _IndexEntry:
+	"""One searchable menu item with the lowercase forms smart_search scores against"""
+	text: str
+	path: str
+	item: Dict
+	keywords: frozenset
+	name_lower: str
+	name_words: frozenset
+	semantic_groups: frozenset
+
+
+class _Crumb(NamedTuple):
+	"""A user's navigation path and the monotonic time it was last updated"""
+	path: Tuple[str, ...]
+	updated: float
+
 
 class SearchEngine:
 	"""Advanced search engine for content matching"""
@@ -21,6 +108,14 @@ class SearchEngine:
 	def __init__(self):
 		logger.debug("Initializing SearchEngine")
 		self.content_index = {}
+		self.inverted: Dict[str, set] = defaultdict(set)
+		self.name_trigrams: Dict[str, set] = defaultdict(set)
+		# name -> text / lowercase name, handed straight to RapidFuzz's batch scorers
+		self._texts: Dict[str, str] = {}
+		self._names_lower: Dict[str, str] = {}
+		# Per-instance result caches, cleared whenever the index is reset
+		self._search_cache: "OrderedDict[Tuple[str, int], Tuple[Tuple[str, int, str], ...]]" = OrderedDict()
+		self._suggest_cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
 		self.user_interactions = {}
 		self.popular_paths = {}
 		logger.info("SearchEngine initialized successfully")
@@ -33,7 +128,7 @@ class SearchEngine:
 		with PerformanceLogger(logger, "index_content"):
 			def index_recursive(items, path=""):
 				if not items:
-					logger.debug(f"No items to index at path: {path}")
+					logger.debug("No items to index at path: %s", path)
 					return
 
 				# Handle both list and single item cases
@@ -53,35 +148,14 @@ class SearchEngine:
 						logger.warning(f"Skipping item without name: {item} at path: {path}")
 						continue
 
-					description = item.get('description', '')
-					meta_description = item.get('meta_description', '')
-
-					# Handle description as list or string
-					if isinstance(description, list):
-						description = ' '.join(description)
-
-					# Create searchable text
-					searchable_text = f"{name} {description} {meta_description}".lower()
-
-					keywords = self._extract_keywords(searchable_text)
-					self.content_index[name] = {
-						'text': searchable_text,
-						'path': path,
-						'item': item,
-						'keywords': keywords
-					}
-
-					logger.debug(f"Indexed: {name} at path: {path} with {len(keywords)} keywords")
+					self.index_item(name, item, path)
 
 					# Index nested items
 					if 'options' in item and item['options']:
-						logger.debug(f"Processing {len(item['options'])} nested options for: {name}")
+						logger.debug("Processing %d nested options for: %s", len(item['options']), name)
 						index_recursive(item['options'], f"{path}/{name}")
 
-			# Clear existing index
-			old_count = len(self.content_index)
-			self.content_index = {}
-			logger.debug(f"Cleared existing index with {old_count} items")
+			self.reset_index()
 
 			try:
 				index_recursive(content_data)
@@ -92,58 +166,121 @@ class SearchEngine:
 				logger.error(traceback.format_exc())
 				raise
 
-	def _extract_keywords(self, text: str) -> List[str]:
-		"""Extract important keywords from text"""
-		logger.debug(f"Extracting keywords from text of length: {len(text)}")
+	def reset_index(self):
+		"""Clear the index before it is rebuilt with index_item"""
+		old_count = len(self.content_index)
+		self.content_index = {}
+		self.inverted = defaultdict(set)
+		self.name_trigrams = defaultdict(set)
+		self._texts = {}
+		self._names_lower = {}
+		self._invalidate_search_cache()
+		logger.debug(f"Cleared existing index with {old_count} items")
+
+	def index_item(self, name: str, item: Dict, path: str):
+		"""Index one named item; callers walking the content tree themselves use this instead of index_content"""
+		description = item.get('description', '')
+		meta_description = item.get('meta_description', '')
+
+		# Handle description as list or string
+		if isinstance(description, list):
+			description = ' '.join(description)
+
+		# Create searchable text
+		searchable_text = f"{name} {description} {meta_description}".lower()
+
+		keywords = _extract_keywords(searchable_text)
+		name_lower = name.lower()
+		name_words = frozenset(name_lower.split())
+		self.content_index[name] = _IndexEntry(
+			text=searchable_text,
+			path=path,
+			item=item,
+			keywords=keywords,
+			name_lower=name_lower,
+			name_words=name_words,
+			semantic_groups=_semantic_groups(name_words)
+		)
 
-		# Remove common words and extract meaningful terms
-		words = re.findall(r'\b\w{2,}\b', text.lower())
-		stop_words = {
-			'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can',
-			'how', 'has', 'had', 'with', 'this', 'that', 'will', 'from',
-			'they', 'been', 'have', 'were', 'said', 'each', 'which',
-			'she', 'him', 'her', 'his', 'their', 'what', 'when', 'where'
-		}
-		keywords = [word for word in words if word not in stop_words and len(word) >= 2]
+		# Inverted indexes so smart_search only scores items that can plausibly match
+		for keyword in keywords:
+			self.inverted[keyword].add(name)
+		for i in range(len(name_lower) - 2):
+			self.name_trigrams[name_lower[i:i + 3]].add(name)
+		self._texts[name] = searchable_text
+		self._names_lower[name] = name_lower
 
-		# Also include original words without filtering for exact matches
-		all_words = re.findall(r'\b\w+\b', text.lower())
-		keywords.extend(all_words)
+		logger.debug("Indexed: %s at path: %s with %d keywords", name, path, len(keywords))
 
-		unique_keywords = list(set(keywords))
-		logger.debug(f"Extracted {len(unique_keywords)} unique keywords from {len(words)} total words")
-		return unique_keywords
+	def _invalidate_search_cache(self):
+		"""Drop memoized search results so they are recomputed against the new index"""
+		self._search_cache.clear()
+		self._suggest_cache.clear()
+		logger.debug("Cleared search caches")
 
 	def smart_search(self, query: str, limit: int = 5) -> List[Tuple[str, int, str]]:
 		"""Perform intelligent content search"""
 		logger.info(f"Starting smart search for query: '{query}' (limit: {limit})")
 
-		with PerformanceLogger(logger, f"smart_search_'{query[:20]}'"):
-			query_lower = query.lower()
+		if not self.content_index:
+			logger.warning("Search index is empty! Cannot perform search")
+			return []
+
+		# Popular queries ("help") are answered from the cache until the index is rebuilt
+		query_lower = query.lower()
+		return list(_lru_get(self._search_cache, (query_lower, limit),
+							 lambda: self._smart_search_uncached(query_lower, limit)))
+
+	def _smart_search_uncached(self, query_lower: str, limit: int) -> Tuple[Tuple[str, int, str], ...]:
+		with PerformanceLogger(logger, f"smart_search_'{query_lower[:20]}'"):
 			results = []
 
-			logger.debug(f"Searching for: '{query}' in {len(self.content_index)} indexed items")
+			logger.debug("Searching for: '%s' in %d indexed items", query_lower, len(self.content_index))
+
+			# Query-side terms are the same for every item; split them once
+			query_words = query_lower.split()
+			query_keywords = _query_keywords(query_lower)
+			query_groups = _semantic_groups(query_words)
 
-			if not self.content_index:
-				logger.warning("Search index is empty! Cannot perform search")
-				return []
+			candidates = self._search_candidates(query_lower, query_keywords)
+			if candidates:
+				# Keep index order so equal scores rank the same as a full scan
+				candidate_names = [name for name in self.content_index if name in candidates]
+				texts = {name: self._texts[name] for name in candidate_names}
+			else:
+				# Nothing shares a word or name trigram with the query (typos, very short queries)
+				candidate_names = list(self.content_index)
+				texts = self._texts
+			logger.debug("Scoring %d of %d indexed items", len(candidate_names), len(self.content_index))
+
+			# Score every candidate text in one batched C++ pass instead of one partial_ratio call per item
+			fuzzy_scores = {
+				name: fuzzy_score
+				for _, fuzzy_score, name in process.extract(
+					query_lower,
+					texts,
+					scorer=fuzz.partial_ratio,
+					processor=None,
+					limit=None,
+				)
+			}
 
 			matches_found = 0
-			for name, data in self.content_index.items():
+			for name in candidate_names:
+				data = self.content_index[name]
 				score = 0
-				name_lower = name.lower()
+				name_lower = data.name_lower
 
 				# Exact name match (highest priority)
 				if query_lower == name_lower:
 					score += 200
-					logger.debug(f"Exact match found: {name}")
+					logger.debug("Exact match found: %s", name)
 				elif query_lower in name_lower:
 					score += 150
-					logger.debug(f"Substring match found: {name}")
+					logger.debug("Substring match found: %s", name)
 
 				# Multi-word exact matches get higher priority
-				query_words = query_lower.split()
-				name_words = name_lower.split()
+				name_words = data.name_words
 
 				# Count exact word matches
 				exact_word_matches = 0
@@ -166,10 +303,9 @@ class SearchEngine:
 							score += 25
 
 				# Keyword matches
-				query_keywords = self._extract_keywords(query_lower)
 				keyword_matches = 0
 				for keyword in query_keywords:
-					if keyword in data['keywords']:
+					if keyword in data.keywords:
 						keyword_matches += 1
 						score += 30
 
@@ -178,111 +314,129 @@ class SearchEngine:
 					score += keyword_matches * 10
 
 				# Fuzzy matching on full text
-				fuzzy_score = fuzz.partial_ratio(query_lower, data['text'])
-				score += fuzzy_score // 2
+				score += int(fuzzy_scores.get(name, 0)) // 2
 
 				# Special scoring for semantic matches
-				semantic_bonus = self._calculate_semantic_bonus(query_lower, name_lower, data['text'])
+				semantic_bonus = self._calculate_semantic_bonus(query_lower, query_groups, data)
 				score += semantic_bonus
 
 				# Context-based scoring (if user has accessed similar content)
 				if hasattr(self, 'user_context'):
-					context_bonus = self._get_context_score(data['path'])
+					context_bonus = self._get_context_score(data.path)
 					score += context_bonus
 
 				# Lower the minimum threshold but prioritize better matches
 				if score > 15:
-					results.append((name, score, data['path']))
+					results.append((name, score, data.path))
 					matches_found += 1
-					logger.debug(
-						f"Match found: {name} (score: {score}) - exact_words: {exact_word_matches}, keywords: {keyword_matches}")
+					logger.debug("Match found: %s (score: %d) - exact_words: %d, keywords: %d",
+								 name, score, exact_word_matches, keyword_matches)
 
-			# Sort by score and return top results
-			results.sort(key=lambda x: x[1], reverse=True)
-			logger.info(f"Found {len(results)} results for query: '{query}' (processed {matches_found} matches)")
+			# Only the top results are returned, so select them instead of sorting every match
+			top = heapq.nlargest(limit, results, key=lambda x: x[1])
+			logger.info(f"Found {len(results)} results for query: '{query_lower}' (processed {matches_found} matches)")
 
 			# Log top 5 results for debugging
-			for i, (name, score, path) in enumerate(results[:5], 1):
-				logger.debug(f"  {i}. {name} (score: {score}) at path: {path}")
-
-			return results[:limit]
-
-	def _calculate_semantic_bonus(self, query: str, name: str, text: str) -> int:
+			if logger.isEnabledFor(logging.DEBUG):
+				for i, (name, score, path) in enumerate(top[:5], 1):
+					logger.debug("  %d. %s (score: %d) at path: %s", i, name, score, path)
+
+			return tuple(top)
+
+	def _search_candidates(self, query_lower: str, query_keywords: frozenset) -> set:
+		"""Collect items sharing a keyword, a semantically related word or a name trigram with the query"""
+		lookup_words = set(query_keywords)
+		for keyword in query_keywords:
+			lookup_words.update(_SEMANTIC_RELATED.get(keyword, ()))
+
+		candidates = set()
+		for word in lookup_words:
+			candidates.update(self.inverted.get(word, ()))
+		for i in range(len(query_lower) - 2):
+			candidates.update(self.name_trigrams.get(query_lower[i:i + 3], ()))
+		return candidates
+
+	def _calculate_semantic_bonus(self, query: str, query_groups: frozenset, data: _IndexEntry) -> int:
 		"""Calculate semantic bonus based on context and meaning"""
-		logger.debug(f"Calculating semantic bonus for query: '{query[:20]}...' and name: '{name[:20]}...'")
-
-		bonus = 0
+		name = data.name_lower
+		text = data.text
 
-		# Define semantic groups
-		semantic_groups = {
-			'music': ['music', 'song', 'audio', 'sound', 'tune', 'melody', 'beat'],
-			'bot': ['bot', 'command', 'automation', 'assistant'],
-			'game': ['game', 'play', 'gaming', 'player', 'match', 'competition'],
-			'server': ['server', 'discord', 'guild', 'community'],
-			'help': ['help', 'guide', 'tutorial', 'instruction', 'manual'],
-			'search': ['search', 'find', 'lookup', 'query']
-		}
-
-		query_words = set(query.split())
-		name_words = set(name.split())
-		text_words = set(text.split())
-
-		# Check for semantic group matches
-		for group, keywords in semantic_groups.items():
-			query_has_group = any(word in keywords for word in query_words)
-			name_has_group = any(word in keywords for word in name_words)
-
-			if query_has_group and name_has_group:
-				bonus += 50
-				logger.debug(f"Semantic match found for group '{group}': +50 points")
+		# Semantic groups shared by query and name; the item's groups are computed at index time
+		bonus = 50 * len(query_groups & data.semantic_groups)
 
 		# Special cases for better matching
 		if 'music' in query and 'bot' in query:
 			if 'music' in name and ('bot' in name or 'command' in text):
 				bonus += 100
-				logger.debug("Strong music bot context match: +100 points")
 
 		if 'command' in query:
 			if 'command' in name or 'command' in text:
 				bonus += 60
-				logger.debug("Command context match: +60 points")
 
 		# Penalty for mismatched contexts
 		if 'music' in query and 'server' in name and 'search' in name:
 			bonus -= 30
-			logger.debug("Context mismatch penalty: -30 points")
 
-		logger.debug(f"Total semantic bonus: {bonus}")
+		logger.debug("Total semantic bonus for '%s': %d", name, bonus)
 		return bonus
 
 	def _get_context_score(self, path: str) -> int:
 		"""Get contextual scoring bonus based on user behavior"""
 		# This could be enhanced with user interaction tracking
-		logger.debug(f"Getting context score for path: {path}")
+		logger.debug("Getting context score for path: %s", path)
 		return 0
 
 	def suggest_alternatives(self, failed_query: str) -> List[str]:
 		"""Suggest alternative searches when no results found"""
 		logger.info(f"Suggesting alternatives for failed query: '{failed_query}'")
+		query_lower = failed_query.lower()
+		return list(_lru_get(self._suggest_cache, query_lower,
+							 lambda: self._suggest_alternatives_uncached(query_lower)))
 
+	def _suggest_alternatives_uncached(self, query_lower: str) -> Tuple[str, ...]:
 		suggestions = []
 
-		# Try partial matches
-		for name in self.content_index.keys():
-			if fuzz.partial_ratio(failed_query.lower(), name.lower()) > 60:
+		# Try partial matches, best first
+		for _, score, name in process.extract(
+				query_lower,
+				self._names_lower,
+				scorer=fuzz.partial_ratio,
+				processor=None,
+				score_cutoff=60,
+				limit=3,
+		):
+			if score > 60:
 				suggestions.append(name)
 
-		logger.debug(f"Found {len(suggestions)} partial match suggestions")
+		logger.debug("Found %d partial match suggestions", len(suggestions))
 
-		# Try related keywords
-		query_words = failed_query.lower().split()
-		for word in query_words:
-			for name, data in self.content_index.items():
-				if word in data['text'] and name not in suggestions:
+		query_words = query_lower.split()
+
+		# Whole-word hits come straight from the keyword index
+		if len(suggestions) < 3:
+			word_hits = set().union(*(self.inverted.get(word, ()) for word in query_words))
+			for name in sorted(word_hits):
+				if name not in suggestions:
+					suggestions.append(name)
+					if len(suggestions) >= 3:
+						break
+
+		# Then words inside longer ones; the scan is lazy and stops as soon as three suggestions are found
+		if len(suggestions) < 3:
+			related = (
+				name
+				for word in query_words
+				for name, text in self._texts.items()
+				if word in text
+			)
+			for name in related:
+				if name not in suggestions:
 					suggestions.append(name)
+					if len(suggestions) >= 3:
+						break
 
-		logger.info(f"Generated {len(suggestions)} total suggestions, returning top 3")
-		return suggestions[:3]
+		logger.info(f"Generated {len(suggestions)} suggestions")
+		return tuple(suggestions[:3])
 
 
 class NavigationBreadcrumbs:
@@ -290,27 +444,28 @@ class NavigationBreadcrumbs:
 
 	def __init__(self):
 		logger.debug("Initializing NavigationBreadcrumbs")
-		self.breadcrumbs = {}
+		# user_id -> crumb, oldest update first
+		self.breadcrumbs: "OrderedDict[int, _Crumb]" = OrderedDict()
 		logger.info("NavigationBreadcrumbs initialized successfully")
 
 	def update_breadcrumb(self, user_id: int, path: List[str]):
 		"""Update user's navigation breadcrumb"""
 		logger.debug(f"Updating breadcrumb for user {user_id} with path: {' -> '.join(path)}")
-		self.breadcrumbs[user_id] = {
-			'path': path,
-			'timestamp': datetime.now()
-		}
+		self.breadcrumbs[user_id] = _Crumb(tuple(path), time.monotonic())
+		self.breadcrumbs.move_to_end(user_id)
+		while len(self.breadcrumbs) > _MAX_BREADCRUMBS:
+			self.breadcrumbs.popitem(last=False)
 		logger.info(f"Breadcrumb updated for user {user_id}: {len(path)} levels deep")
 
 	def get_breadcrumb_display(self, user_id: int) -> str:
 		"""Get formatted breadcrumb display"""
 		logger.debug(f"Getting breadcrumb display for user {user_id}")
 
-		if user_id not in self.breadcrumbs:
+		path = self._get_path(user_id)
+		if path is None:
 			logger.debug(f"No breadcrumb found for user {user_id}")
 			return ""
 
-		path = self.breadcrumbs[user_id]['path']
 		if not path:
 			logger.debug(f"Empty breadcrumb path for user {user_id}")
 			return ""
@@ -323,13 +478,24 @@ class NavigationBreadcrumbs:
 		"""Get full navigation path for user"""
 		logger.debug(f"Getting full navigation path for user {user_id}")
 
-		if user_id not in self.breadcrumbs:
+		path = self._get_path(user_id)
+		if path is None:
 			logger.debug(f"No navigation path found for user {user_id}")
 			return []
 
-		path = self.breadcrumbs[user_id]['path']
 		logger.debug(f"Retrieved navigation path for user {user_id}: {len(path)} items")
-		return path
+		# Callers extend or trim the path before storing it again
+		return list(path)
+
+	def _get_path(self, user_id: int) -> Optional[Tuple[str, ...]]:
+		"""Return the user's stored path, dropping it once it is older than the breadcrumb TTL"""
+		crumb = self.breadcrumbs.get(user_id)
+		if crumb is None:
+			return None
+		if time.monotonic() - crumb.updated > _BREADCRUMB_TTL_SECONDS:
+			del self.breadcrumbs[user_id]
+			return None
+		return crumb.path
 
 
 class QuickAccessManager:
@@ -337,37 +503,50 @@ class QuickAccessManager:
 
 	def __init__(self):
 		logger.debug("Initializing QuickAccessManager")
-		self.access_count = {}
+		# user_id -> Counter of content_name accesses, least recently active user first
+		self.access_count: "OrderedDict[int, Counter]" = OrderedDict()
 		self.user_favorites = {}
-		self.trending_content = {}
+		self.trending_content = Counter()
+		self._last_trending_decay = time.monotonic()
 		logger.info("QuickAccessManager initialized successfully")
 
 	def track_access(self, user_id: int, content_name: str):
 		"""Track content access for analytics"""
-		key = f"{user_id}:{content_name}"
-		old_count = self.access_count.get(key, 0)
-		self.access_count[key] = old_count + 1
+		user_counts = self.access_count.get(user_id)
+		if user_counts is None:
+			user_counts = self.access_count[user_id] = Counter()
+			if len(self.access_count) > _MAX_ACCESS_USERS:
+				self.access_count.popitem(last=False)
+		else:
+			self.access_count.move_to_end(user_id)
+		old_count = user_counts[content_name]
+		user_counts[content_name] = old_count + 1
 
 		# Update trending
-		old_trending = self.trending_content.get(content_name, 0)
-		self.trending_content[content_name] = old_trending + 1
+		self._decay_trending()
+		self.trending_content[content_name] += 1
 
 		logger.debug(f"Tracked access for user {user_id}, content '{content_name}': {old_count} -> {old_count + 1}")
 		logger.info(f"Content access tracked: user={user_id}, content='{content_name}', total_accesses={old_count + 1}")
 
+	def _decay_trending(self):
+		"""Halve trending counts once per decay period, dropping entries that reach zero"""
+		now = time.monotonic()
+		if now - self._last_trending_decay < _TRENDING_DECAY_SECONDS:
+			return
+		self._last_trending_decay = now
+		self.trending_content = Counter({
+			content: count // 2 for content, count in self.trending_content.items() if count > 1
+		})
+		logger.debug("Decayed trending counts, %d items remain", len(self.trending_content))
+
 	def get_user_shortcuts(self, user_id: int) -> List[str]:
 		"""Get user's most accessed content as shortcuts"""
 		logger.debug(f"Getting shortcuts for user {user_id}")
 
-		user_content = {}
-		for key, count in self.access_count.items():
-			if key.startswith(f"{user_id}:"):
-				content = key.split(":", 1)[1]
-				user_content[content] = count
-
 		# Return top 5 most accessed
-		sorted_content = sorted(user_content.items(), key=lambda x: x[1], reverse=True)
-		shortcuts = [content for content, _ in sorted_content[:5]]
+		user_counts = self.access_count.get(user_id, Counter())
+		shortcuts = [content for content, _ in user_counts.most_common(5)]
 
 		logger.info(f"Generated {len(shortcuts)} shortcuts for user {user_id}")
 		return shortcuts
@@ -376,8 +555,7 @@ class QuickAccessManager:
 		"""Get trending content across all users"""
 		logger.debug(f"Getting trending content (limit: {limit})")
 
-		sorted_trending = sorted(self.trending_content.items(), key=lambda x: x[1], reverse=True)
-		trending = [content for content, _ in sorted_trending[:limit]]
+		trending = [content for content, _ in self.trending_content.most_common(limit)]
 
 		logger.info(f"Retrieved {len(trending)} trending items from {len(self.trending_content)} total items")
 		return trending
@@ -392,6 +570,8 @@ class GuideManager:
 		self.navigation = NavigationBreadcrumbs()
 		self.quick_access = QuickAccessManager()
 		self.content_cache = {}
+		# name -> (entry, parent name) for every menu item, so selections resolve without the database
+		self.name_to_entry: Dict[str, Tuple[dict, str]] = {}
 		self.cache_timestamp = None
 		logger.info("GuideManager initialized successfully")
 
@@ -423,19 +603,21 @@ class GuideManager:
 			with PerformanceLogger(logger, "build_search_index"):
 				# Use DatabaseManager to get the guide menus collection
 				guide_collection = db_manager.get_collection_manager('guide_menues')
-				data = await guide_collection.find_many({}, sort=[('order', 1)])
+				data = await guide_collection.find_many({}, projection=_GUIDE_MENU_PROJECTION, sort=[('order', 1)])
 
 				logger.info(f"Retrieved {len(data)} documents from database")
 
 				if data:
 					logger.debug(f"Sample document structure: {list(data[0].keys()) if data else 'No data'}")
 
-				# Build content cache with ALL items (including nested ones)
+				# Cache ALL items (including nested ones) and index them for search in the same pass
 				old_cache_size = len(self.content_cache)
 				self.content_cache = {}
+				self.name_to_entry = {}
+				self.search_engine.reset_index()
 
-				def cache_recursive(items, parent_path=""):
-					"""Recursively cache all items including nested ones"""
+				def walk(items, parent_path=""):
+					"""Recursively cache and index all items including nested ones"""
 					if not items:
 						logger.debug(f"No items to cache at path: {parent_path}")
 						return
@@ -457,32 +639,23 @@ class GuideManager:
 							logger.warning(f"Skipping item without name for caching at path: {parent_path}")
 							continue
 
-						# Cache this item
 						self.content_cache[name] = item
+						# Top-level items win a duplicated name, then the shallowest nested one, as the database lookup did
+						if parent_path:
+							self.name_to_entry.setdefault(name, (item, parent_path.split('/')[-1]))
+						else:
+							self.name_to_entry[name] = (item, "")
+						self.search_engine.index_item(name, item, parent_path)
 						cached_count += 1
 
 						# Recursively cache nested items
 						if 'options' in item and item['options']:
 							logger.debug(f"Caching {len(item['options'])} nested items for: {name}")
-							cache_recursive(item['options'], f"{parent_path}/{name}")
+							walk(item['options'], f"{parent_path}/{name}")
 
 					logger.debug(f"Cached {cached_count} items at path: {parent_path}")
 
-				# Cache top-level items first
-				top_level_cached = 0
-				for item in data:
-					if item.get('name'):
-						self.content_cache[item['name']] = item
-						top_level_cached += 1
-
-				logger.info(f"Cached {top_level_cached} top-level items")
-
-				# Then cache all nested items
-				cache_recursive(data)
-
-				# Now build the search index
-				logger.debug("Building search engine index from cached content")
-				self.search_engine.index_content(data)
+				walk(data)
 				self.cache_timestamp = datetime.now()
 
 				logger.info(f"Search index built successfully:")
@@ -548,8 +721,8 @@ class GuideManager:
 			sample_key = list(self.search_engine.content_index.keys())[0]
 			sample_data = self.search_engine.content_index[sample_key]
 			logger.info(f"Sample index entry: {sample_key}")
-			logger.info(f"Sample keywords: {sample_data['keywords'][:10]}")
-			logger.info(f"Sample text: {sample_data['text'][:100]}...")
+			logger.info(f"Sample keywords: {sorted(sample_data.keywords)[:10]}")
+			logger.info(f"Sample text: {sample_data.text[:100]}...")
 
 		# Test a simple search
 		test_results = self.search_engine.smart_search("help")
@@ -645,6 +818,13 @@ class GuideManager:
 				if author_id:
 					self.quick_access.track_access(author_id, option_name)
 
+				# Every indexed item is cached with its parent; only unknown names need the database
+				cached = self.name_to_entry.get(option_name)
+				if cached:
+					entry, parent_name = cached
+					logger.debug("Resolved '%s' from the menu index (parent: '%s')", option_name, parent_name)
+					return self._build_selection(entry, option_name, author_id, parent_name)
+
 				logger.debug(f"Fetching entry for selected option: {option_name}")
 
 				# Use DatabaseManager to find the entry
@@ -783,48 +963,51 @@ class GuideManager:
 		logger.debug(f"Enhanced embed created successfully for '{option_name}'")
 		return embed
 
+	def _build_selection(self, entry, option_name, author_id, parent_name):
+		"""Build the embed and view for a menu item, updating the user's breadcrumb with its parent"""
+		if author_id:
+			current_path = self.navigation.get_navigation_path(author_id)
+			if parent_name and parent_name not in current_path:
+				current_path.append(parent_name)
+			if option_name not in current_path:
+				current_path.append(option_name)
+			self.navigation.update_breadcrumb(author_id, current_path)
+
+		embed = self._create_enhanced_embed(entry, author_id, option_name)
+
+		if entry.get("type") == "select":
+			view = EnhancedHistoryTrackingView(
+				entry.get("options", []),
+				current_option=option_name,
+				author_id=author_id,
+				search_manager=self.search_engine,
+				quick_access_manager=self.quick_access
+			)
+			logger.debug(f"Created select view with {len(entry.get('options', []))} options")
+		else:
+			view = EnhancedHistoryTrackingView(
+				[],
+				current_option=option_name,
+				author_id=author_id,
+				search_manager=self.search_engine,
+				quick_access_manager=self.quick_access
+			)
+			logger.debug("Created embed view")
+
+		return embed, view
+
 	async def search_nested_options(self, options, option_name, author_id=None, parent_name=""):
 		"""Enhanced nested search with parent context"""
 		logger.debug(f"Searching nested options for '{option_name}' in parent '{parent_name}' ({len(options)} options)")
 
+		debug = logger.isEnabledFor(logging.DEBUG)
 		for i, option in enumerate(options):
-			logger.debug(f"Checking nested option {i + 1}/{len(options)}: {option.get('name', 'unnamed')}")
+			if debug:
+				logger.debug("Checking nested option %d/%d: %s", i + 1, len(options), option.get('name', 'unnamed'))
 
 			if option.get("name") == option_name:
 				logger.info(f"Match found for option: {option_name} in parent: {parent_name}")
-
-				# Update breadcrumb with parent context
-				if author_id and parent_name:
-					current_path = self.navigation.get_navigation_path(author_id)
-					if parent_name not in current_path:
-						current_path.append(parent_name)
-					if option_name not in current_path:
-						current_path.append(option_name)
-					self.navigation.update_breadcrumb(author_id, current_path)
-
-				option_type = option.get("type")
-				embed = self._create_enhanced_embed(option, author_id, option_name)
-
-				if option_type == "select":
-					view = EnhancedHistoryTrackingView(
-						option.get("options", []),
-						current_option=option_name,
-						author_id=author_id,
-						search_manager=self.search_engine,
-						quick_access_manager=self.quick_access
-					)
-					logger.debug(f"Created nested select view with {len(option.get('options', []))} options")
-				else:
-					view = EnhancedHistoryTrackingView(
-						[],
-						current_option=option_name,
-						author_id=author_id,
-						search_manager=self.search_engine,
-						quick_access_manager=self.quick_access
-					)
-					logger.debug("Created nested embed view")
-
-				return embed, view
+				return self._build_selection(option, option_name, author_id, parent_name)
 
 			# Recurse into deeper nested options
 			if isinstance(option.get("options"), list):
@@ -848,7 +1031,7 @@ class GuideManager:
 		logger.info(f"Performing intelligent question matching for: '{question}' (user: {author_id})")
 
 		# Clean the question
-		question_clean = re.sub(r'[^\w\s]', '', question.lower())
+		question_clean = _PUNCTUATION_RE.sub('', question.lower())
 		question_words = question_clean.split()
 		logger.debug(f"Cleaned question: '{question_clean}' ({len(question_words)} words)")
 
@@ -1,6 +1,6 @@
 import logging
 from discord.ext import commands
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, utils
 
 from utils.bot import SIMILARITY_THRESHOLD
 from Guide.guide import guide_manager  # Import the guide_manager instance
@@ -61,7 +61,7 @@ class HelpListener(commands.Cog):
 		for keyword, menu_name in sorted(KEYWORD_MAP.items(), key=lambda x: len(x[0]), reverse=True):
 			if len(keyword) < 4:
 				continue
-			similarity = fuzz.token_set_ratio(keyword, content)
+			similarity = fuzz.token_set_ratio(keyword, content, processor=utils.default_process)
 			if similarity >= SIMILARITY_THRESHOLD:
 				embed, view = await guide_manager.get_embed_for_selection(menu_name, author_id=author_id)
 				logger.info(f"Fuzzy match: {keyword} ~ {content} ({similarity}%)")
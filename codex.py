@@ -9,6 +9,7 @@ from utils.bot import bot, TOKEN, s
 from utils.logger import get_logger, setup_application_logging
 from utils.sync import load_cogs, attach_databases
 from IdleStatus.idle import rotate_status
+from configuration.config_system import config
 
 # Initialize application-wide logging
 APPLICATION_NAME = "discord-bot-codex"
@@ -163,6 +164,13 @@ async def shutdown_handler():
 	except Exception as e:
 		logger.error(f"Error stopping status rotation: {e}", exc_info=True)
 
+	# Write any debounced configuration changes and stop the save thread
+	try:
+		config.close()
+		logger.info("Pending configuration changes saved")
+	except Exception as e:
+		logger.error(f"Error saving configuration: {e}", exc_info=True)
+
 	# Close bot connection
 	try:
 		if not bot.is_closed():
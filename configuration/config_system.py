@@ -1,7 +1,12 @@
 import json
+import logging
+import mmap
 import os
+import stat
+import threading
 import time
-from typing import Any, Dict, List, Set, Type, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Set, Type, Optional
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
@@ -9,50 +14,59 @@ from configuration.sub_systems.settings_define import SettingsDefine, ConfigDefi
 from configuration.sub_systems.settings_update import SettingsUpdate
 from configuration.sub_systems.settings_validate import SettingsValidater
 from utils.logger import get_logger
+import orjson
 import yaml
 
 load_dotenv()
 
 config_dir = os.getenv("CONFIG_DIR")
+# JSON config files at least this large are parsed from a memory map rather than a read() copy
+MMAP_LOAD_THRESHOLD = 1024 * 1024
 # Initialize logger for this module
 logger = get_logger("config_system")
 
-S = " " * 50
-
-def format_value_for_logging(value: Any, max_single_line: int = 80) -> str:
-    """Format values nicely for logging output with smart formatting."""
-    if isinstance(value, (dict, list)):
-        # Convert to pretty JSON
-        pretty_json = json.dumps(value, indent=2, ensure_ascii=False)
-
-        # Check if it's small enough for single line
-        compact_str = json.dumps(value, ensure_ascii=False)
-        if len(compact_str) <= max_single_line:
-            return f" {compact_str}"
-
-        # For multi-line, add proper indentation and {s} at the start of each line
-        indented = pretty_json.replace('\n', f'\n{S}')
-        return f" \n{S}{S}{indented}"
-
-    return f" {value}"
 
 class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
     def __init__(self, config_path: str = config_dir):
         logger.info(f"Initializing BotConfig with path: {config_path}")
         self.config_path = config_path
-        # Debugging: List files in config directory
-        if os.path.exists(config_path):
-            logger.debug(f"Files in {config_path}: {os.listdir(config_path)}")
-        else:
+        # Stat the config path once and reuse it for the debug listing and directory creation
+        try:
+            path_stat = os.stat(config_path)
+        except FileNotFoundError:
+            path_stat = None
+        is_dir = path_stat is not None and stat.S_ISDIR(path_stat.st_mode)
+        if path_stat is None:
             logger.warning(f"Directory {config_path} does not exist.")
+        elif is_dir and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Files in {config_path}: {os.listdir(config_path)}")
 
         self._config_definitions: Dict[str, ConfigDefinition] = {}
         self._values: Dict[str, Any] = {}
         self._callbacks: List[callable] = []
+        # Memoized role lookups, cleared by _invalidate_lookups whenever the values change
+        self._description_limit_cache: Dict[int, int] = {}
+        self._tiers_cache: Dict[int, FrozenSet[str]] = {}
+        self._feature_access_cache: Dict[tuple, bool] = {}
+        self._sorted_files: List[str] = []
+        self._dir_mtimes: Dict[str, int] = {}
+        # Debounced save state, see SettingsUpdate.save_config
+        self._dirty: bool = False
+        self._flush_handle = None
+        self._save_lock = threading.Lock()
+        self._config_is_dir: bool = is_dir
+        self._last_saved_hash: Optional[bytes] = None
+        # Nesting depth of SettingsUpdate.batch() and whether an update is waiting for it to exit
+        self._batch_depth: int = 0
+        self._batch_dirty: bool = False
+        # Config writes run here so the file and directory fsyncs never block the caller
+        self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="config-save")
+        self._pending_save: Optional[Future] = None
 
         try:
-            os.makedirs(os.path.dirname(config_path), exist_ok=True)
-            logger.debug(f"Ensured config directory exists: {os.path.dirname(config_path)}")
+            config_dir_path = config_path if is_dir else (os.path.dirname(config_path) or ".")
+            os.makedirs(config_dir_path, exist_ok=True)
+            logger.debug(f"Ensured config directory exists: {config_dir_path}")
         except Exception as e:
             logger.error(f"Failed to create config directory: {e}", exc_info=True)
             raise
@@ -74,8 +88,14 @@ class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
                     return config_data if config_data else {}
 
             elif file_path.endswith('.json'):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    config_data = json.load(f)
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the handlers below still apply
+                with open(file_path, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size >= MMAP_LOAD_THRESHOLD:
+                        # Parse straight from the page cache instead of copying the file into a bytes object
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                            config_data = orjson.loads(memoryview(mapped))
+                    else:
+                        config_data = orjson.loads(f.read())
                     logger.debug(f"JSON - Successfully loaded '{file_path}' with {len(config_data)} keys")
                     return config_data
 
@@ -107,6 +127,35 @@ class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
 
         return merged
 
+    def _dir_listing_unchanged(self) -> bool:
+        """Check whether any walked directory changed since the file list was cached"""
+        if not self._dir_mtimes:
+            return False
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in self._dir_mtimes.items())
+        except OSError:
+            return False
+
+    def _get_config_files(self) -> List[str]:
+        """Get the sorted config file list, reusing the cached list while no directory has changed"""
+        if self._dir_listing_unchanged():
+            logger.debug(f"Reusing cached config file list ({len(self._sorted_files)} file(s))")
+            return self._sorted_files
+
+        config_files = []
+        dir_mtimes = {}
+
+        # Collect all valid config files, remembering each directory's mtime
+        for root, _, files in os.walk(self.config_path):
+            dir_mtimes[root] = os.stat(root).st_mtime_ns
+            for file in files:
+                if file.endswith(('.yaml', '.yml', '.json')):
+                    config_files.append(os.path.join(root, file))
+
+        self._sorted_files = sorted(config_files)
+        self._dir_mtimes = dir_mtimes
+        return self._sorted_files
+
     def load_config(self):
         """Load configuration from file(s) - supports single file or directory with multiple files"""
         logger.info(f"Loading configuration from: {self.config_path}")
@@ -122,13 +171,7 @@ class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
             # Load from a directory - walk through and merge all config files
             if os.path.isdir(self.config_path):
                 logger.debug(f"Loading configuration from directory: {self.config_path}")
-                config_files = []
-
-                # Collect all valid config files
-                for root, _, files in os.walk(self.config_path):
-                    for file in files:
-                        if file.endswith(('.yaml', '.yml', '.json')):
-                            config_files.append(os.path.join(root, file))
+                config_files = self._get_config_files()
 
                 if not config_files:
                     logger.warning(f"No configuration files found in directory: {self.config_path}")
@@ -138,15 +181,11 @@ class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
                 logger.info(f"Found {len(config_files)} configuration file(s) in directory")
 
                 # Load and merge all config files
-                for config_file in sorted(config_files):  # Sort for consistent load order
+                for config_file in config_files:  # Already sorted for consistent load order
                     try:
                         loaded_config = self._load_file(config_file)
                         file_config = self._merge_configs(file_config, loaded_config)
-                        logger.debug(f"Merged configuration from: {os.path.basename(config_file)}")
-                        logger.debug(f"Successfully merged {len(loaded_config)} configuration key(s)")
-                        for key, value in file_config.items():
-                            formatted_value = format_value_for_logging(value)
-                            logger.debug(f"Loaded key '{key}' with value: {formatted_value}")
+                        logger.debug("merged %s: %d top-level keys", os.path.basename(config_file), len(loaded_config))
                     except Exception as e:
                         logger.error(f"Failed to load config file '{config_file}': {e}", exc_info=True)
                         raise
@@ -157,22 +196,12 @@ class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
             elif self.config_path.endswith(('.yaml', '.yml')):
                 logger.debug(f"Loading configuration from single YAML file: {self.config_path}")
                 file_config = self._load_file(self.config_path)
-                for key, value in file_config.items():
-                    formatted_value = format_value_for_logging(value)
-                    logger.debug(f"\n"
-                                 f"YAML - Loaded key\n"
-                                 f" '{key}':"
-                                 f"{formatted_value}")
                 logger.debug(f"YAML - Successfully loaded '{self.config_path}' with {len(file_config)} keys")
 
             # Load from a single JSON file
             elif self.config_path.endswith('.json'):
                 logger.debug(f"Loading configuration from single JSON file: {self.config_path}")
                 file_config = self._load_file(self.config_path)
-                # Log the key values
-                for key, value in file_config.items():
-                    formatted_value = format_value_for_logging(value)
-                    logger.debug(f"JSON - Loaded key '{key}' with value: {formatted_value}")
                 logger.debug(f"JSON - Successfully loaded '{self.config_path}' with {len(file_config)} keys")
 
             # Unsupported file extension
@@ -186,6 +215,7 @@ class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
 
             # Validate and load the merged configuration
             self._validate_and_load(file_config)
+            self._invalidate_lookups()
             logger.info(f"Configuration loaded and validated successfully with {len(file_config)} top-level keys")
 
         except json.JSONDecodeError as e:
@@ -198,11 +228,17 @@ class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
             logger.error(f"Error loading configuration: {e}", exc_info=True)
             raise
 
+    def dump_config(self, fp):
+        """Write the full merged configuration as indented JSON to a binary file object (admin/debug use)"""
+        fp.write(orjson.dumps(self._values, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        logger.debug(f"Dumped configuration with {len(self._values)} top-level keys")
+
     def _create_default_config(self):
         """Create default config file"""
         logger.info("Creating default configuration")
         try:
             self._values = {key: definition.default for key, definition in self._config_definitions.items()}
+            self._invalidate_lookups()
             self.save_config()
             logger.info(f"Default configuration created successfully at: {self.config_path}")
         except Exception as e:
@@ -344,16 +380,28 @@ class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
         """Get admin channel ID (convenience method)"""
         return self.admin_channel_id
 
+    def _invalidate_lookups(self):
+        """Clear memoized role lookups so they are recomputed from the current values"""
+        self._description_limit_cache.clear()
+        self._tiers_cache.clear()
+        self._feature_access_cache.clear()
+        logger.debug("Cleared role lookup caches")
+
     def get_description_limit_for_role(self, role_id: int) -> int:
         """Get the description limit for a specific role"""
-        limit = self.role_description_limits.get(role_id, self.default_description_limit)
-        logger.debug(f"Description limit for role_id {role_id}: {limit}")
+        limit = self._description_limit_cache.get(role_id)
+        if limit is None:
+            limit = self.role_description_limits.get(role_id, self.default_description_limit)
+            self._description_limit_cache[role_id] = limit
+            logger.debug(f"Description limit for role_id {role_id}: {limit}")
         return limit
 
-    def get_tiers_for_role(self, role_id: int) -> Set[str]:
+    def get_tiers_for_role(self, role_id: int) -> FrozenSet[str]:
         """Get tiers for a specific role"""
-        tiers = self.role_to_tier_mapping.get(role_id, set())
-        logger.debug(f"Tiers for role_id {role_id}: {tiers}")
+        tiers = self._tiers_cache.get(role_id)
+        if tiers is None:
+            tiers = self._tiers_cache[role_id] = frozenset(self.role_to_tier_mapping.get(role_id, ()))
+            logger.debug(f"Tiers for role_id {role_id}: {set(tiers)}")
         return tiers
 
     def get_available_colors(self, user_tiers: Set[str]) -> Dict[str, int]:
@@ -373,8 +421,11 @@ class BotConfig(SettingsValidater, SettingsDefine, SettingsUpdate):
 
     def can_access_feature(self, role_id: int, feature: str) -> bool:
         """Check if a role can access a feature"""
-        can_access = role_id in self.feature_access.get(feature, set())
-        logger.debug(f"Role {role_id} can access feature '{feature}': {can_access}")
+        key = (role_id, feature)
+        can_access = self._feature_access_cache.get(key)
+        if can_access is None:
+            can_access = self._feature_access_cache[key] = role_id in self.feature_access.get(feature, set())
+            logger.debug(f"Role {role_id} can access feature '{feature}': {can_access}")
         return can_access
 
     def add_callback(self, callback: callable):
@@ -1,37 +1,174 @@
-import json
+import asyncio
+import hashlib
 import os
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import partial
 from typing import Set, Dict, Any, Optional
 
+import orjson
+
 from utils.logger import get_logger
 
 logger = get_logger("SettingsUpdate")
 
+# Updates landing within this window of each other are written to disk once
+SAVE_DEBOUNCE_SECONDS = 0.25
+
+# Channel types accepted by update_channel_id and the config key each one sets
+_CHANNEL_KEYS = {
+    "suggestion": "suggestion_channel_id",
+    "admin": "admin_channel_id",
+}
+
+
+def _write_durably(path: str, data: bytes):
+    """Write data beside path, make it durable, then swap it in; runs on the save executor, off the caller's thread"""
+    # Readers never see a half-written file, and a crash leaves either the old or the new one
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    # Persist the rename itself; directories cannot be opened for fsync on Windows
+    if os.name != 'nt':
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
 class SettingsUpdate:
     def save_config(self):
+        """Mark the configuration dirty and schedule one coalesced write for the current burst of updates"""
+        self._dirty = True
+        if self._flush_handle is not None:
+            logger.debug("Configuration save already scheduled, coalescing update")
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (startup, scripts); fall back to a timer thread
+            timer = threading.Timer(SAVE_DEBOUNCE_SECONDS, self._flush)
+            # Never keep the process alive for a save; shutdown writes through flush_sync instead
+            timer.daemon = True
+            timer.start()
+            self._flush_handle = timer
+        else:
+            self._flush_handle = loop.call_later(SAVE_DEBOUNCE_SECONDS, self._flush)
+        logger.debug("Scheduled configuration save in %ss", SAVE_DEBOUNCE_SECONDS)
+
+    def flush_sync(self):
+        """Write any pending configuration changes now and wait for them to reach disk; raises if they were not saved"""
+        handle = self._flush_handle
+        if handle is not None:
+            handle.cancel()
+        self._flush(reraise=True)
+        pending = self._pending_save
+        if pending is not None:
+            pending.result()
+
+    def _flush(self, reraise: bool = False):
+        """Write the configuration if it changed since the last write"""
+        with self._save_lock:
+            self._flush_handle = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            try:
+                self._save_config_now()
+            except Exception:
+                # Already logged; keep the changes pending for the next save or flush_sync
+                self._dirty = True
+                if reraise:
+                    raise
+
+    def _save_config_now(self):
         """Save current configuration to file"""
         logger.info(f"Saving configuration to: {self.config_path}")
         try:
             # Only save to file paths, not directories
-            if os.path.isdir(self.config_path):
+            if self._config_is_dir:
                 logger.warning(f"Cannot save to directory path: {self.config_path}. Skipping save operation.")
                 return
 
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self._values, f, indent=2, ensure_ascii=False)
-            logger.debug(f"Configuration saved successfully with {len(self._values)} values")
+            # Serialize once and hand the file a single write instead of json.dump's many small ones
+            data = orjson.dumps(self._values, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+            # Idempotent updates serialize to the same bytes; skip the disk entirely for them. Compared
+            # against the last write submitted, since queued writes land in order and that one wins
+            digest = hashlib.blake2b(data, digest_size=8).digest()
+            if digest == self._last_saved_hash:
+                logger.debug("Configuration unchanged since last save, skipping write")
+                return
+
+            # One worker, so queued writes land in order and the newest data wins
+            future = self._save_executor.submit(_write_durably, self.config_path, data)
+            self._last_saved_hash = digest
+            future.add_done_callback(partial(self._on_saved, len(self._values)))
+            self._pending_save = future
         except Exception as e:
             logger.error(f"Failed to save configuration: {e}", exc_info=True)
             raise
 
+    def _on_saved(self, value_count: int, future: Future):
+        """Report a finished background write; a failed one keeps the changes pending for the next save"""
+        error = future.exception()
+        if error is None:
+            logger.debug("Configuration saved successfully with %d values", value_count)
+            return
+        self._dirty = True
+        self._last_saved_hash = None
+        logger.error(f"Failed to save configuration: {error}", exc_info=error)
+
+    def close(self):
+        """Write pending changes and stop the save executor (call on shutdown)"""
+        try:
+            self.flush_sync()
+        finally:
+            self._save_executor.shutdown(wait=True)
+
+    @contextmanager
+    def batch(self):
+        """
+        Group several updates into one save and one callback notification.
+
+        Usage:
+            with config.batch():
+                config.update_role_tier(...)
+                config.update_role_limit(...)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._batch_dirty:
+                self._batch_dirty = False
+                self.save_config()
+                self._notify_callbacks()
+
+    def _apply_change(self):
+        """Save and notify after an update, or defer both to the end of the enclosing batch"""
+        # Lookups must see the update right away, even before a batch notifies
+        self._invalidate_lookups()
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
+        self.save_config()
+        self._notify_callbacks()
+
     def update_role_tier(self, role_id: int, tiers: Set[str]):
         """Update tier mapping for a role"""
         logger.info(f"Updating role tier for role_id {role_id} with tiers: {tiers}")
         try:
-            current = self._values.get("role_to_tier_mapping", {})
-            current[str(role_id)] = list(tiers)
-            self._values["role_to_tier_mapping"] = current
-            self.save_config()
-            self._notify_callbacks()
+            self._values.setdefault("role_to_tier_mapping", {})[str(role_id)] = list(tiers)
+            self._apply_change()
             logger.info(f"Successfully updated role tier for role_id {role_id}")
         except Exception as e:
             logger.error(f"Failed to update role tier for role_id {role_id}: {e}", exc_info=True)
@@ -42,11 +179,8 @@ class SettingsUpdate:
         capped_limit = min(limit, 4000)
         logger.info(f"Updating role limit for role_id {role_id}: {limit} (capped: {capped_limit})")
         try:
-            current = self._values.get("role_description_limits", {})
-            current[str(role_id)] = capped_limit
-            self._values["role_description_limits"] = current
-            self.save_config()
-            self._notify_callbacks()
+            self._values.setdefault("role_description_limits", {})[str(role_id)] = capped_limit
+            self._apply_change()
             logger.info(f"Successfully updated role limit for role_id {role_id}")
         except Exception as e:
             logger.error(f"Failed to update role limit for role_id {role_id}: {e}", exc_info=True)
@@ -58,8 +192,7 @@ class SettingsUpdate:
         try:
             # Validation happens automatically through the ConfigDefinition validator
             self._values["max_cache_entries"] = max_entries
-            self.save_config()
-            self._notify_callbacks()
+            self._apply_change()
             logger.info(f"Successfully updated max_cache_entries to: {max_entries}")
         except Exception as e:
             logger.error(f"Failed to update max_cache_entries: {e}", exc_info=True)
@@ -71,8 +204,7 @@ class SettingsUpdate:
         try:
             # Validation happens automatically through the ConfigDefinition validator
             self._values["cache_duration"] = duration
-            self.save_config()
-            self._notify_callbacks()
+            self._apply_change()
             logger.info(f"Successfully updated cache_duration to: {duration} seconds")
         except Exception as e:
             logger.error(f"Failed to update cache_duration: {e}", exc_info=True)
@@ -82,11 +214,8 @@ class SettingsUpdate:
         """Update colors for a specific tier"""
         logger.info(f"Updating colors for tier '{tier}' with {len(colors)} colors")
         try:
-            current = self._values.get("color_tiers", {})
-            current[tier] = colors
-            self._values["color_tiers"] = current
-            self.save_config()
-            self._notify_callbacks()
+            self._values.setdefault("color_tiers", {})[tier] = colors
+            self._apply_change()
             logger.info(f"Successfully updated colors for tier '{tier}'")
         except Exception as e:
             logger.error(f"Failed to update colors for tier '{tier}': {e}", exc_info=True)
@@ -96,20 +225,19 @@ class SettingsUpdate:
         """Update which roles have access to a feature"""
         logger.info(f"Updating feature access for '{feature}' with {len(role_ids)} roles")
         try:
-            current = self._values.get("feature_access", {})
-            current[feature] = [str(rid) for rid in role_ids]
-            self._values["feature_access"] = current
-            self.save_config()
-            self._notify_callbacks()
+            self._values.setdefault("feature_access", {})[feature] = [str(rid) for rid in role_ids]
+            self._apply_change()
             logger.info(f"Successfully updated feature access for '{feature}'")
         except Exception as e:
             logger.error(f"Failed to update feature access for '{feature}': {e}", exc_info=True)
             raise
 
-    async def update_channel_id(self, channel_type: str, channel_id: int, channel_name: str = None, bot=None):
+    def update_channel_id(self, channel_type: str, channel_id: int, channel_name: str = None, bot=None):
         """
         Update a channel ID and optionally store its name.
 
+        Runs synchronously; bot.get_channel is a cache lookup, so nothing here needs to await.
+
         Args:
             channel_type: Either "suggestion" or "admin"
             channel_id: The Discord channel ID
@@ -119,9 +247,8 @@ class SettingsUpdate:
         logger.info(f"Updating {channel_type}_channel_id to: {channel_id}")
 
         try:
-            config_key = f"{channel_type}_channel_id"
-
-            if config_key not in self._config_definitions:
+            config_key = _CHANNEL_KEYS.get(channel_type)
+            if config_key is None:
                 raise ValueError(f"Unknown channel type: {channel_type}")
 
             # Validate channel_id
@@ -133,7 +260,7 @@ class SettingsUpdate:
                 channel = bot.get_channel(channel_id)
                 if channel:
                     channel_name = channel.name
-                    logger.debug(f"Fetched channel name: {channel_name}")
+                    logger.debug("Fetched channel name: %s", channel_name)
                 else:
                     logger.warning(f"Could not fetch channel name for ID: {channel_id}")
 
@@ -142,24 +269,26 @@ class SettingsUpdate:
 
             # Update channel names mapping if name is provided
             if channel_name:
-                current_names = self._values.get("channel_names", {})
-                current_names[str(channel_id)] = channel_name
-                self._values["channel_names"] = current_names
-                logger.debug(f"Updated channel name mapping: {channel_id} -> {channel_name}")
+                self._values.setdefault("channel_names", {})[str(channel_id)] = channel_name
+                logger.debug("Updated channel name mapping: %s -> %s", channel_id, channel_name)
 
-            self.save_config()
-            self._notify_callbacks()
+            self._apply_change()
             logger.info(f"Successfully updated {channel_type}_channel_id to: {channel_id}")
 
         except Exception as e:
             logger.error(f"Failed to update {channel_type}_channel_id: {e}", exc_info=True)
             raise
+
     def _notify_callbacks(self):
         """Notify all callbacks of config changes"""
-        logger.debug(f"Notifying {len(self._callbacks)} callbacks of config changes")
-        for callback in self._callbacks:
+        self._invalidate_lookups()
+        # Snapshot so a callback adding or removing callbacks cannot disturb this pass
+        callbacks = tuple(self._callbacks)
+        values = self._values
+        logger.debug("Notifying %d callbacks of config changes", len(callbacks))
+        for callback in callbacks:
             try:
-                callback(self._values)
-                logger.debug(f"Successfully executed callback: {callback.__name__}")
+                callback(values)
             except Exception as e:
-                logger.error(f"Error in config callback {callback.__name__}: {e}", exc_info=True)
\ No newline at end of file
+                logger.error("Error in config callback %s: %s", getattr(callback, '__name__', repr(callback)), e,
+                             exc_info=True)